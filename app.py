@@ -1,18 +1,36 @@
-from flask import Flask, jsonify
+import threading
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
-from config import config
-from models.database import get_database
+from flask_socketio import SocketIO, emit, join_room, leave_room
+from pymongo.errors import PyMongoError
+from config import config, Config
+from models.competition import competition_scope, current_competition, room_for
+from models.database import db_manager
 
 # Import routes
 from routes.team_routes import team_bp
 from routes.user_routes import user_bp
 from routes.leaderboard_routes import leaderboard_bp
 from routes.admin_routes import admin_bp
+from routes.health_routes import health_bp
+from routes.stats_routes import stats_bp
+from utils.broadcast import BroadcastScheduler
+from utils.competition import init_competition_scope, requested_competition
+from utils.compression import init_compression
+from utils.load_shedding import init_load_shedding
+from utils.throttle import Throttle
 
 # Global SocketIO instance
 socketio = None
 
+# Replaces the Flask-SocketIO broadcast when another server owns the sockets
+# (see asgi.py)
+broadcaster = None
+
+# One broadcast scheduler per competition, created on first use
+_broadcast_schedulers = {}
+_broadcast_schedulers_lock = threading.Lock()
+
 def create_app(config_name='development'):
     """Application factory"""
     global socketio
@@ -25,21 +43,36 @@ def create_app(config_name='development'):
     # Enable CORS
     CORS(app, resources={r"/*": {"origins": "*"}})
     
-    # Initialize SocketIO with auto-detected async mode
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    # Reject excess load with 503/Retry-After instead of queueing it; runs
+    # first so shed requests never look up their competition
+    init_load_shedding(app)
+    
+    # Scope each request to the registered competition it names (?competition=)
+    init_competition_scope(app)
     
-    # Initialize database connection
-    try:
-        db = get_database()
-        print(f"[OK] Flask app connected to database: {app.config['DATABASE_NAME']}")
-    except Exception as e:
-        print(f"[ERROR] Failed to connect to database: {e}")
+    # Compress HTTP responses above the size threshold
+    init_compression(app)
+    
+    # Initialize SocketIO with auto-detected async mode; long-polling payloads
+    # are compressed above the threshold and WebSocket frames use
+    # permessage-deflate where the server transport negotiates it
+    socketio = SocketIO(
+        app,
+        cors_allowed_origins="*",
+        http_compression=True,
+        compression_threshold=app.config['COMPRESSION_MIN_SIZE']
+    )
+    
+    # Connect lazily and warm up in the background; /readyz reports progress
+    db_manager.start_warm_up(warm_up)
     
     # Register blueprints
     app.register_blueprint(team_bp)
     app.register_blueprint(user_bp)
     app.register_blueprint(leaderboard_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(stats_bp)
     
     # Root route
     @app.route('/')
@@ -49,7 +82,8 @@ def create_app(config_name='development'):
             'endpoints': {
                 'teams': '/api/teams',
                 'users': '/api/users',
-                'leaderboard': '/api/leaderboard'
+                'leaderboard': '/api/leaderboard',
+                'stats': '/api/stats'
             },
             'websocket': 'Socket.IO enabled for real-time updates'
         })
@@ -63,54 +97,152 @@ def create_app(config_name='development'):
     def internal_error(error):
         return jsonify({'error': 'Internal server error'}), 500
     
+    # Per-connection limit on request_leaderboard
+    leaderboard_throttle = Throttle(
+        rate=app.config['SOCKET_LEADERBOARD_RATE'],
+        burst=app.config['SOCKET_LEADERBOARD_BURST']
+    )
+    
+    # Competition each socket is subscribed to; its room receives broadcasts
+    socket_competitions = {}
+    
+    def socket_competition(data):
+        """Competition for a socket event, moving the socket to its room if it changed"""
+        current = socket_competitions.get(request.sid, Config.DEFAULT_COMPETITION)
+        competition_id = requested_competition(data) if data.get('competition') else current
+        if competition_id != current:
+            leave_room(room_for(current))
+            join_room(room_for(competition_id))
+            socket_competitions[request.sid] = competition_id
+        return competition_id
+    
     # WebSocket event handlers
     @socketio.on('connect')
     def handle_connect():
-        print('[WebSocket] Client connected')
-        emit('connection_response', {'status': 'connected'})
+        try:
+            competition_id = requested_competition(request.args)
+        except (ValueError, PyMongoError):
+            return False
+        
+        print(f'[WebSocket] Client connected to competition {competition_id}')
+        socket_competitions[request.sid] = competition_id
+        join_room(room_for(competition_id))
+        emit('connection_response', {'status': 'connected', 'competition': competition_id})
     
     @socketio.on('disconnect')
     def handle_disconnect():
         print('[WebSocket] Client disconnected')
+        leaderboard_throttle.forget(request.sid)
+        socket_competitions.pop(request.sid, None)
     
     @socketio.on('request_leaderboard')
     def handle_leaderboard_request(data):
         """Handle leaderboard data request via WebSocket"""
         from models.team import Team
         from models.user import User
-        from utils.serializers import serialize_doc
+        from utils.leaderboard import get_leaderboard_snapshot
+        from utils.serializers import parse_fields
         
+        if not leaderboard_throttle.allow(request.sid):
+            emit('error', {'error': 'Too many leaderboard requests, slow down'})
+            return
+        
+        data = data or {}
         team_id = data.get('team_id')
         
-        if team_id:
-            # Send user leaderboard
-            users = User.get_leaderboard_by_team(team_id)
-            emit('leaderboard_update', {
-                'type': 'users',
-                'team_id': team_id,
-                'leaderboard': [serialize_doc(user) for user in users]
-            })
-        else:
-            # Send team leaderboard
-            teams = Team.get_leaderboard()
-            emit('leaderboard_update', {
-                'type': 'teams',
-                'leaderboard': [serialize_doc(team) for team in teams]
-            })
+        try:
+            competition_id = socket_competition(data)
+            fields = parse_fields(data.get('fields'), User.FIELDS if team_id else Team.FIELDS)
+        except ValueError as e:
+            emit('error', {'error': str(e)})
+            return
+        except PyMongoError as e:
+            emit('error', {'error': f'Leaderboard unavailable: {e}'})
+            return
+        
+        # Send user leaderboard for a team, or the team leaderboard
+        try:
+            with competition_scope(competition_id):
+                snapshot = get_leaderboard_snapshot(team_id, fields)
+        except PyMongoError as e:
+            emit('error', {'error': f'Leaderboard unavailable: {e}'})
+            return
+        if snapshot is None:
+            emit('error', {'error': 'Team not found'})
+            return
+        emit('leaderboard_update', snapshot.payload)
+    
+    @socketio.on('request_player_leaderboard')
+    def handle_player_leaderboard_request(data):
+        """Handle global player leaderboard request via WebSocket"""
+        from models.user import User
+        from utils.leaderboard import get_players_page, get_players_snapshot, parse_page_limit
+        from utils.serializers import parse_fields
+        
+        if not leaderboard_throttle.allow(request.sid):
+            emit('error', {'error': 'Too many leaderboard requests, slow down'})
+            return
+        
+        data = data or {}
+        cursor = data.get('cursor')
+        
+        try:
+            competition_id = socket_competition(data)
+            fields = parse_fields(data.get('fields'), User.PLAYER_FIELDS)
+            limit = parse_page_limit(data.get('limit'))
+            with competition_scope(competition_id):
+                if cursor is None and limit <= app.config['LEADERBOARD_TOP_K']:
+                    payload = get_players_snapshot(fields, limit).payload
+                else:
+                    payload = get_players_page(fields, limit, cursor)
+        except (TypeError, ValueError) as e:
+            emit('error', {'error': str(e)})
+            return
+        except PyMongoError as e:
+            emit('error', {'error': f'Leaderboard unavailable: {e}'})
+            return
+        
+        emit('player_leaderboard_update', payload)
     
     return app
 
-def broadcast_leaderboard_update():
-    """Broadcast leaderboard update to all connected clients"""
-    if socketio:
-        from models.team import Team
-        from utils.serializers import serialize_doc
-        
-        teams = Team.get_leaderboard()
-        socketio.emit('leaderboard_update', {
-            'type': 'teams',
-            'leaderboard': [serialize_doc(team) for team in teams]
-        }, broadcast=True)
+def warm_up():
+    """Create indexes and prime the leaderboard view before taking traffic"""
+    from models.team import Team
+    from models.user import User
+    from models.leaderboard_view import LeaderboardView
+    
+    Team.create_indexes()
+    User.create_indexes()
+    LeaderboardView.get_entries(LeaderboardView.TEAMS_KEY)
+    LeaderboardView.get_entries(LeaderboardView.PLAYERS_KEY)
+
+def set_broadcaster(fn):
+    """Route leaderboard broadcasts to fn(payload, room) instead of Flask-SocketIO"""
+    global broadcaster
+    broadcaster = fn
+
+def emit_leaderboard(payload, room):
+    """Send a leaderboard_update to every client in a room"""
+    if broadcaster:
+        broadcaster(payload, room)
+    elif socketio:
+        socketio.emit('leaderboard_update', payload, to=room)
+
+def broadcast_leaderboard_update(competition_id=None):
+    """Broadcast a leaderboard update to the clients of a competition
+
+    Defaults to the competition in scope. Updates are coalesced per
+    competition, so a burst of writes sends one broadcast.
+    """
+    if broadcaster or socketio:
+        competition_id = competition_id or current_competition()
+        with _broadcast_schedulers_lock:
+            scheduler = _broadcast_schedulers.get(competition_id)
+            if scheduler is None:
+                scheduler = BroadcastScheduler(competition_id, emit_leaderboard, Config.BROADCAST_INTERVAL)
+                _broadcast_schedulers[competition_id] = scheduler
+        scheduler.request()
 
 if __name__ == '__main__':
     app = create_app()
@@ -119,6 +251,8 @@ if __name__ == '__main__':
     print("="*50)
     print("\n[Available Endpoints]")
     print("  - GET  /                     - API information")
+    print("  - GET  /healthz              - Liveness probe")
+    print("  - GET  /readyz               - Readiness probe")
     print("  - GET  /api/teams            - Get all teams")
     print("  - POST /api/teams            - Create team")
     print("  - GET  /api/teams/<id>       - Get team by ID")
@@ -131,6 +265,9 @@ if __name__ == '__main__':
     print("  - DELETE /api/users/<id>     - Delete user")
     print("  - GET  /api/leaderboard      - Get team rankings")
     print("  - GET  /api/leaderboard?team_id=<id> - Get user rankings for team")
+    print("  - GET  /api/leaderboard/players - Get global player rankings")
+    print("  - GET  /api/leaderboard/export  - Stream ranked leaderboard (CSV/NDJSON)")
+    print("  - GET  /api/stats            - Score distribution (global or ?team_id=<id>)")
     print("\n[WebSocket Support]")
     print("  - Real-time leaderboard updates enabled")
     print("  - Socket.IO endpoint: ws://localhost:8003")
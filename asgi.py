@@ -0,0 +1,246 @@
+"""
+Asyncio deployment mode
+
+Serves Socket.IO from python-socketio's AsyncServer and GET /api/leaderboard
+through Motor on a single event loop, so thousands of idle spectators cost a
+coroutine each rather than a thread. Every other route is the regular Flask
+app, run concurrently on a thread pool; its writes keep the existing model
+semantics and their broadcasts are handed to the async server.
+
+Run with:
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --host 0.0.0.0 --port 8003
+"""
+
+import asyncio
+import inspect
+import json
+from urllib.parse import parse_qs
+
+import socketio
+from pymongo.errors import PyMongoError
+
+import app as flask_app_module
+from config import Config
+from models.competition import CompetitionNotFoundError, competition_scope, room_for
+from models.team import Team
+from models.user import User
+from utils.competition import requested_competition
+from utils.compression import choose_encoding
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS
+from utils.leaderboard import (
+    get_leaderboard_snapshot_async, get_players_page, get_players_snapshot, parse_page_limit
+)
+from utils.serializers import parse_fields
+from utils.throttle import Throttle
+from utils.wsgi_bridge import PooledWsgiToAsgi
+
+flask_app = flask_app_module.create_app('production')
+
+sio = socketio.AsyncServer(
+    async_mode='asgi',
+    cors_allowed_origins='*',
+    http_compression=True,
+    compression_threshold=Config.COMPRESSION_MIN_SIZE
+)
+
+leaderboard_throttle = Throttle(
+    rate=Config.SOCKET_LEADERBOARD_RATE,
+    burst=Config.SOCKET_LEADERBOARD_BURST
+)
+
+_loop = None
+
+# Competition each socket is subscribed to; its room receives broadcasts
+socket_competitions = {}
+
+async def on_startup():
+    """Capture the event loop and route Flask broadcasts onto it"""
+    global _loop
+    _loop = asyncio.get_running_loop()
+
+    def broadcast(payload, room):
+        asyncio.run_coroutine_threadsafe(sio.emit('leaderboard_update', payload, room=room), _loop)
+
+    flask_app_module.set_broadcaster(broadcast)
+
+async def maybe_await(result):
+    """Await room operations, which are coroutines only in newer python-socketio"""
+    if inspect.isawaitable(result):
+        await result
+
+async def socket_competition(sid, data):
+    """Competition for a socket event, moving the socket to its room if it changed"""
+    current = socket_competitions.get(sid, Config.DEFAULT_COMPETITION)
+    if data.get('competition'):
+        competition_id = await asyncio.to_thread(requested_competition, data)
+    else:
+        competition_id = current
+    if competition_id != current:
+        await maybe_await(sio.leave_room(sid, room_for(current)))
+        await maybe_await(sio.enter_room(sid, room_for(competition_id)))
+        socket_competitions[sid] = competition_id
+    return competition_id
+
+# WebSocket event handlers
+@sio.event
+async def connect(sid, environ):
+    args = {key: values[0] for key, values in parse_qs(environ.get('QUERY_STRING', '')).items()}
+    try:
+        competition_id = await asyncio.to_thread(requested_competition, args)
+    except (ValueError, PyMongoError):
+        return False
+
+    print(f'[WebSocket] Client connected to competition {competition_id}')
+    socket_competitions[sid] = competition_id
+    await maybe_await(sio.enter_room(sid, room_for(competition_id)))
+    await sio.emit('connection_response', {'status': 'connected', 'competition': competition_id}, to=sid)
+
+@sio.event
+async def disconnect(sid):
+    print('[WebSocket] Client disconnected')
+    leaderboard_throttle.forget(sid)
+    socket_competitions.pop(sid, None)
+
+@sio.on('request_leaderboard')
+async def handle_leaderboard_request(sid, data):
+    """Handle leaderboard data request via WebSocket"""
+    if not leaderboard_throttle.allow(sid):
+        await sio.emit('error', {'error': 'Too many leaderboard requests, slow down'}, to=sid)
+        return
+
+    data = data or {}
+    team_id = data.get('team_id')
+
+    try:
+        competition_id = await socket_competition(sid, data)
+        fields = parse_fields(data.get('fields'), User.FIELDS if team_id else Team.FIELDS)
+    except ValueError as e:
+        await sio.emit('error', {'error': str(e)}, to=sid)
+        return
+    except PyMongoError as e:
+        await sio.emit('error', {'error': f'Leaderboard unavailable: {e}'}, to=sid)
+        return
+
+    try:
+        with competition_scope(competition_id):
+            snapshot = await get_leaderboard_snapshot_async(team_id, fields)
+    except PyMongoError as e:
+        await sio.emit('error', {'error': f'Leaderboard unavailable: {e}'}, to=sid)
+        return
+    if snapshot is None:
+        await sio.emit('error', {'error': 'Team not found'}, to=sid)
+        return
+    await sio.emit('leaderboard_update', snapshot.payload, to=sid)
+
+@sio.on('request_player_leaderboard')
+async def handle_player_leaderboard_request(sid, data):
+    """Handle global player leaderboard request via WebSocket"""
+    if not leaderboard_throttle.allow(sid):
+        await sio.emit('error', {'error': 'Too many leaderboard requests, slow down'}, to=sid)
+        return
+
+    data = data or {}
+    cursor = data.get('cursor')
+
+    try:
+        competition_id = await socket_competition(sid, data)
+        fields = parse_fields(data.get('fields'), User.PLAYER_FIELDS)
+        limit = parse_page_limit(data.get('limit'))
+        with competition_scope(competition_id):
+            if cursor is None and limit <= Config.LEADERBOARD_TOP_K:
+                snapshot = await asyncio.to_thread(get_players_snapshot, fields, limit)
+                payload = snapshot.payload
+            else:
+                payload = await asyncio.to_thread(get_players_page, fields, limit, cursor)
+    except (TypeError, ValueError) as e:
+        await sio.emit('error', {'error': str(e)}, to=sid)
+        return
+    except PyMongoError as e:
+        await sio.emit('error', {'error': f'Leaderboard unavailable: {e}'}, to=sid)
+        return
+
+    await sio.emit('player_leaderboard_update', payload, to=sid)
+
+async def send_json(send, status, body, headers=()):
+    """Send a complete HTTP response"""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def get_leaderboard(scope, send):
+    """Async-native GET /api/leaderboard, same contract as the Flask route"""
+    args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    team_id = args.get('team_id', [None])[0]
+    request_headers = dict(scope.get('headers', []))
+
+    try:
+        competition_id = await asyncio.to_thread(requested_competition, {
+            'competition': args.get('competition', [None])[0]
+                or request_headers.get(b'x-competition-id', b'').decode('latin-1')
+        })
+        fields = parse_fields(args.get('fields', [None])[0], User.FIELDS if team_id else Team.FIELDS)
+
+        with competition_scope(competition_id):
+            snapshot = await get_leaderboard_snapshot_async(team_id, fields)
+        if snapshot is None:
+            await send_json(send, 404, json.dumps({'error': 'Team not found'}).encode())
+            return
+
+        accept_encoding = request_headers.get(b'accept-encoding', b'').decode('latin-1')
+        encoding = choose_encoding(len(snapshot.body), Config.COMPRESSION_MIN_SIZE, accept_encoding)
+
+        headers = [(b'vary', b'Accept-Encoding')]
+        if encoding:
+            headers.append((b'content-encoding', encoding.encode()))
+        if snapshot.stale:
+            headers.append((b'warning', b'110 - "Response is Stale"'))
+        await send_json(send, 200, snapshot.encode(encoding), headers)
+
+    except CompetitionNotFoundError as e:
+        await send_json(send, 404, json.dumps({'error': str(e)}).encode())
+    except ValueError as e:
+        await send_json(send, 400, json.dumps({'error': str(e)}).encode())
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        retry_after = getattr(e, 'retry_after', Config.RETRY_AFTER_SECONDS)
+        await send_json(send, 503, json.dumps({'error': str(e)}).encode(),
+                        [(b'retry-after', str(retry_after).encode())])
+    except Exception as e:
+        await send_json(send, 500, json.dumps({'error': str(e)}).encode())
+
+# Flask requests run concurrently on their own pool. It has more threads than
+# the in-flight bound so requests over the bound reach load shedding and get
+# a fast 503 instead of queueing
+wsgi_app = PooledWsgiToAsgi(flask_app, max_workers=2 * Config.MAX_IN_FLIGHT_REQUESTS)
+
+def with_cors(scope, send):
+    """Wrap send to add the CORS headers Flask-CORS sets on Flask responses (any origin)"""
+    origin = dict(scope.get('headers', [])).get(b'origin')
+
+    async def send_with_cors(message):
+        if message['type'] == 'http.response.start':
+            headers = [(name, value) for name, value in message.get('headers', []) if name != b'vary']
+            vary = [value for name, value in message.get('headers', []) if name == b'vary']
+            if origin:
+                headers.append((b'access-control-allow-origin', origin))
+                vary.append(b'Origin')
+            else:
+                headers.append((b'access-control-allow-origin', b'*'))
+            if vary:
+                headers.append((b'vary', b', '.join(vary)))
+            message = {**message, 'headers': headers}
+        await send(message)
+    return send_with_cors
+
+async def http_app(scope, receive, send):
+    """Serve hot read paths natively and everything else through Flask"""
+    if scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'] == '/api/leaderboard':
+        # Bypasses Flask, so Flask-CORS does not see this response
+        await get_leaderboard(scope, with_cors(scope, send))
+    else:
+        await wsgi_app(scope, receive, send)
+
+app = socketio.ASGIApp(sio, other_asgi_app=http_app, on_startup=on_startup)
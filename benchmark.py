@@ -0,0 +1,121 @@
+"""
+Benchmark for Podium API deployment modes
+Compares WebSocket connections per process and leaderboard latency between
+the threaded server (python app.py) and the asyncio server (uvicorn asgi:app)
+
+Usage:
+    python benchmark.py --url http://localhost:8003 --clients 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+import socketio
+
+def print_section(title):
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60)
+
+def summarize(name, samples):
+    """Print latency percentiles in milliseconds"""
+    if not samples:
+        print(f"  - {name}: no successful samples")
+        return
+    samples = sorted(samples)
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    print(f"  - {name}: n={len(samples)} mean={statistics.mean(samples) * 1000:.1f}ms "
+          f"p50={p(0.5):.1f}ms p95={p(0.95):.1f}ms p99={p(0.99):.1f}ms")
+
+async def open_client(url, connected, failures):
+    """Connect one spectator and keep it open"""
+    client = socketio.AsyncClient(reconnection=False)
+    try:
+        await client.connect(url, transports=['websocket'], wait_timeout=30)
+        connected.append(client)
+    except Exception:
+        failures.append(1)
+
+async def leaderboard_roundtrip(client, latencies):
+    """Time one request_leaderboard -> leaderboard_update round trip"""
+    done = asyncio.get_running_loop().create_future()
+    
+    def on_update(data):
+        if not done.done():
+            done.set_result(data)
+    
+    client.on('leaderboard_update', on_update)
+    start = time.perf_counter()
+    await client.emit('request_leaderboard', {})
+    try:
+        await asyncio.wait_for(done, timeout=30)
+        latencies.append(time.perf_counter() - start)
+    except asyncio.TimeoutError:
+        pass
+
+async def http_request(session, url, latencies, errors, path='/api/leaderboard'):
+    """Time one GET request"""
+    start = time.perf_counter()
+    try:
+        async with session.get(f"{url}{path}") as response:
+            await response.read()
+            if response.status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(response.status)
+    except aiohttp.ClientError:
+        errors.append('connection')
+
+async def run(url, clients, requests, ramp):
+    print_section(f"Opening {clients} WebSocket connections")
+    connected, failures = [], []
+    start = time.perf_counter()
+    for batch_start in range(0, clients, ramp):
+        batch = range(batch_start, min(clients, batch_start + ramp))
+        await asyncio.gather(*(open_client(url, connected, failures) for _ in batch))
+    print(f"  - Connected: {len(connected)} / {clients} in {time.perf_counter() - start:.1f}s")
+    print(f"  - Failed: {len(failures)}")
+    
+    print_section("Socket.IO request_leaderboard latency (all clients at once)")
+    socket_latencies = []
+    await asyncio.gather(*(leaderboard_roundtrip(c, socket_latencies) for c in connected))
+    summarize('request_leaderboard', socket_latencies)
+    
+    print_section(f"HTTP GET /api/leaderboard latency ({requests} concurrent requests)")
+    http_latencies, errors = [], []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        await asyncio.gather(*(http_request(session, url, http_latencies, errors) for _ in range(requests)))
+    summarize('GET /api/leaderboard', http_latencies)
+    print(f"  - Errors: {len(errors)}")
+    
+    # Served by the Flask handlers in both modes; in asyncio mode this
+    # measures the thread pool the ASGI app runs them on
+    print_section(f"HTTP GET /api/leaderboard/players latency ({requests} concurrent requests)")
+    flask_latencies, errors = [], []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        await asyncio.gather(*(
+            http_request(session, url, flask_latencies, errors, '/api/leaderboard/players')
+            for _ in range(requests)
+        ))
+    summarize('GET /api/leaderboard/players', flask_latencies)
+    print(f"  - Errors: {len(errors)}")
+    
+    await asyncio.gather(*(c.disconnect() for c in connected), return_exceptions=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8003')
+    parser.add_argument('--clients', type=int, default=1000, help='WebSocket spectators to hold open')
+    parser.add_argument('--requests', type=int, default=500, help='Concurrent HTTP leaderboard requests')
+    parser.add_argument('--ramp', type=int, default=100, help='Connections opened per batch')
+    args = parser.parse_args()
+    
+    print("\n" + "🚀 PODIUM BENCHMARK" + "\n")
+    print(f"Target: {args.url}")
+    asyncio.run(run(args.url, args.clients, args.requests, args.ramp))
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,52 @@ class Config:
     MONGO_URI = os.getenv('MONGO_URI')
     DATABASE_NAME = os.getenv('DATABASE_NAME', 'poduim')
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    
+    # Connections kept open in the pool so first requests skip the handshake
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 5))
+    
+    # MongoDB deadlines (milliseconds): client-side timeouts bound every
+    # network step, MONGO_MAX_TIME_MS is sent as maxTimeMS on reads
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 2000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 2000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 5000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 1000))
+    MONGO_MAX_TIME_MS = int(os.getenv('MONGO_MAX_TIME_MS', 2000))
+    
+    # Circuit breaker: open after this many consecutive failures, probe again
+    # after the reset timeout (seconds)
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_RESET_TIMEOUT = float(os.getenv('BREAKER_RESET_TIMEOUT', 10))
+    
+    # Requests handled at once before new ones are rejected with 503
+    MAX_IN_FLIGHT_REQUESTS = int(os.getenv('MAX_IN_FLIGHT_REQUESTS', 64))
+    RETRY_AFTER_SECONDS = int(os.getenv('RETRY_AFTER_SECONDS', 5))
+    
+    # Competitions: 'collection' gives each competition its own collections,
+    # 'shared' keeps one collection per model keyed by competition_id
+    COMPETITION_STORAGE = os.getenv('COMPETITION_STORAGE', 'collection')
+    DEFAULT_COMPETITION = os.getenv('DEFAULT_COMPETITION', 'default')
+    
+    # Cached score statistics younger than this many seconds are served even
+    # if scores changed since, bounding aggregations to one per interval
+    STATS_MIN_RECOMPUTE_INTERVAL = float(os.getenv('STATS_MIN_RECOMPUTE_INTERVAL', 5))
+    
+    # Leaderboard broadcasts for a competition are coalesced over this many seconds
+    BROADCAST_INTERVAL = float(os.getenv('BROADCAST_INTERVAL', 0.25))
+    
+    # Number of entries kept in each materialized leaderboard view
+    LEADERBOARD_TOP_K = int(os.getenv('LEADERBOARD_TOP_K', 100))
+    
+    # Per-connection request_leaderboard limit (requests/second and burst size)
+    SOCKET_LEADERBOARD_RATE = float(os.getenv('SOCKET_LEADERBOARD_RATE', 1))
+    SOCKET_LEADERBOARD_BURST = int(os.getenv('SOCKET_LEADERBOARD_BURST', 5))
+    
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    
+    # Leaderboard exports
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    EXPORT_MAX_CONCURRENT = int(os.getenv('EXPORT_MAX_CONCURRENT', 2))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
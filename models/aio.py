@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from pymongo.errors import ConfigurationError
+from config import Config
+from models.competition import collection_name, scoped_key
+from models.database import BreakerListener, CircuitOpenError, db_manager
+from models.leaderboard_view import LeaderboardView
+
+class AsyncDatabase:
+    """Lazy Motor (asyncio MongoDB driver) connection manager for the ASGI app"""
+    _instance = None
+    _client = None
+    _db = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncDatabase, cls).__new__(cls)
+        return cls._instance
+    
+    def get_database(self):
+        """Get database instance, creating the client on first use
+
+        Shares the synchronous manager's circuit breaker, so both drivers
+        fail fast together.
+        """
+        if not db_manager.breaker.allow():
+            raise CircuitOpenError(db_manager.breaker.retry_after())
+        if self._db is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            
+            with self._lock:
+                if self._db is None:
+                    if not Config.MONGO_URI:
+                        raise ConfigurationError("MONGO_URI not found in environment variables")
+                    self._client = AsyncIOMotorClient(
+                        Config.MONGO_URI,
+                        serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+                        socketTimeoutMS=Config.MONGO_SOCKET_TIMEOUT_MS,
+                        waitQueueTimeoutMS=Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                        minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+                        event_listeners=[BreakerListener(db_manager.breaker)]
+                    )
+                    self._db = self._client[Config.DATABASE_NAME]
+        return self._db
+    
+    def close(self):
+        """Close database connection"""
+        with self._lock:
+            if self._client:
+                self._client.close()
+                self._client = None
+                self._db = None
+
+# Global async database instance
+async_db_manager = AsyncDatabase()
+
+class AsyncLeaderboardView:
+    """Non-blocking reads of the materialized leaderboards.
+    
+    Mirrors LeaderboardView's read methods; refreshes and every write path
+    still go through the synchronous models, run off the event loop.
+    """
+    
+    @staticmethod
+    def get_collection():
+        """Get leaderboard views collection for the current competition"""
+        return async_db_manager.get_database()[collection_name('leaderboard_views')]
+    
+    @staticmethod
+    async def get_version(key):
+        """Get a board's version token without fetching its entries, or None"""
+        view = await AsyncLeaderboardView.get_collection().find_one(
+            {'_id': scoped_key(key)},
+            {'version': 1, 'updated_at': 1},
+            max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        if view is None:
+            return None
+        return (view.get('version'), view.get('updated_at'))
+    
+    @staticmethod
+    async def get_entries(key, projection=None):
+        """Get the ranked entries of a board, building it on first use"""
+        view_projection = None
+        if projection:
+            view_projection = {f'entries.{field}': 1 for field, include in projection.items() if include}
+        
+        view = await AsyncLeaderboardView.get_collection().find_one(
+            {'_id': scoped_key(key)}, view_projection, max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        if view is None:
+            return await asyncio.to_thread(LeaderboardView.refresh, key)
+        return view.get('entries', [])
@@ -0,0 +1,165 @@
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from config import Config
+from models.database import get_database
+
+# Competition the current request, socket event or task is working in
+_current = ContextVar('competition_id', default=None)
+
+COMPETITION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def validate_competition_id(competition_id):
+    """Return competition_id if it is a valid key, else raise ValueError"""
+    if not isinstance(competition_id, str) or not COMPETITION_ID_PATTERN.match(competition_id):
+        raise ValueError('competition must be 1-64 letters, digits, "-" or "_"')
+    return competition_id
+
+def current_competition():
+    """Competition in scope, or the default competition"""
+    return _current.get() or Config.DEFAULT_COMPETITION
+
+def set_competition(competition_id):
+    """Enter a competition scope; pass the returned token to reset_competition"""
+    return _current.set(validate_competition_id(competition_id))
+
+def reset_competition(token):
+    """Leave a competition scope entered with set_competition"""
+    _current.reset(token)
+
+@contextmanager
+def competition_scope(competition_id):
+    """Run a block against one competition's data"""
+    token = set_competition(competition_id)
+    try:
+        yield competition_id
+    finally:
+        reset_competition(token)
+
+def is_shared_storage():
+    """True when all competitions share one collection per model"""
+    return Config.COMPETITION_STORAGE == 'shared'
+
+def collection_name(name):
+    """Collection holding `name` documents for the current competition
+
+    With per-competition storage every competition gets its own
+    collections (`teams__<competition>`); the default competition keeps
+    the original names so existing data is served unchanged.
+    """
+    competition_id = current_competition()
+    if is_shared_storage() or competition_id == Config.DEFAULT_COMPETITION:
+        return name
+    return f'{name}__{competition_id}'
+
+def scope_filter(query=None):
+    """Restrict a query to the current competition (shared storage only)"""
+    query = query or {}
+    if is_shared_storage():
+        return {'competition_id': current_competition(), **query}
+    return query
+
+def scope_document(doc):
+    """Tag a new document with the current competition (shared storage only)"""
+    if is_shared_storage():
+        doc['competition_id'] = current_competition()
+    return doc
+
+def scoped_index(keys):
+    """Prefix index keys with the competition key (shared storage only)"""
+    if is_shared_storage():
+        return [('competition_id', 1)] + list(keys)
+    return list(keys)
+
+def scoped_index_name(name):
+    """Name of an index built with scoped_index
+
+    The competition-prefixed indexes get their own names, so switching an
+    existing database to shared storage adds them next to the old ones
+    instead of conflicting with them.
+    """
+    if is_shared_storage():
+        return f'competition_{name}'
+    return name
+
+def scoped_key(key):
+    """Namespace a derived document _id (views, counters) by competition in shared storage"""
+    if is_shared_storage():
+        return f'{current_competition()}/{key}'
+    return key
+
+def room_for(competition_id):
+    """Socket.IO room receiving a competition's broadcasts"""
+    return f'competition:{competition_id}'
+
+class CompetitionNotFoundError(ValueError):
+    """Raised for a competition id that has not been registered"""
+
+    def __init__(self, competition_id):
+        super().__init__(f"Competition not found: {competition_id}")
+        self.competition_id = competition_id
+
+class Competition:
+    """Registry of competitions in the `competitions` collection
+
+    Requests can only be scoped to registered competitions (and the default
+    one), so clients cannot create collections, indexes or cache entries by
+    naming new ids.
+    """
+
+    # Registered ids seen by this process; competitions are never unregistered
+    _known = set()
+
+    @staticmethod
+    def get_collection():
+        """Get the competitions collection, shared by all competitions"""
+        db = get_database()
+        return db['competitions']
+
+    @staticmethod
+    def create(competition_id, name=None):
+        """Register a competition after creating its indexes
+
+        Returns None if the competition is already registered.
+        """
+        from models.team import Team
+        from models.user import User
+
+        validate_competition_id(competition_id)
+        with competition_scope(competition_id):
+            Team.create_indexes()
+            User.create_indexes()
+
+        competition = {
+            '_id': competition_id,
+            'name': name or competition_id,
+            'created_at': datetime.utcnow()
+        }
+        try:
+            Competition.get_collection().insert_one(competition)
+        except DuplicateKeyError:
+            return None
+        Competition._known.add(competition_id)
+        return competition
+
+    @staticmethod
+    def get_all():
+        """Get all registered competitions"""
+        return list(Competition.get_collection().find(
+            {}, max_time_ms=Config.MONGO_MAX_TIME_MS
+        ).sort('created_at', 1))
+
+    @staticmethod
+    def exists(competition_id):
+        """Check that a competition is registered, remembering ids that are"""
+        if competition_id == Config.DEFAULT_COMPETITION or competition_id in Competition._known:
+            return True
+        found = Competition.get_collection().find_one(
+            {'_id': competition_id}, {'_id': 1}, max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        if found is None:
+            return False
+        Competition._known.add(competition_id)
+        return True
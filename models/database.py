@@ -1,59 +1,231 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
-import os
-from dotenv import load_dotenv
+import threading
+import time
+import pymongo
+from pymongo import MongoClient, monitoring
+from pymongo.errors import ConfigurationError, PyMongoError
+from config import Config
 
-load_dotenv()
+# Server error code for an operation exceeding maxTimeMS
+MAX_TIME_MS_EXPIRED = 50
+
+class CircuitOpenError(PyMongoError):
+    """Raised instead of querying MongoDB while the circuit breaker is open"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Database unavailable, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Stops sending work to MongoDB after repeated timeouts or network errors
+
+    closed: requests flow; consecutive failures are counted.
+    open: requests fail fast with CircuitOpenError until reset_timeout passes.
+    half-open: one probe is let through; success closes, failure reopens.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_at = None
+
+    @property
+    def is_open(self):
+        """True while requests should fail fast"""
+        opened_at = self._opened_at
+        return opened_at is not None and time.monotonic() - opened_at < self.reset_timeout
+
+    def retry_after(self):
+        """Seconds until the breaker lets a probe through"""
+        if self._opened_at is None:
+            return 0
+        return max(1, int(self.reset_timeout - (time.monotonic() - self._opened_at)) + 1)
+
+    def allow(self):
+        """Check whether a database call may proceed"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: one probe at a time, re-armed if it never reports back
+            if self._probe_at is None or now - self._probe_at >= self.reset_timeout:
+                self._probe_at = now
+                return True
+            return False
+
+    def record_success(self):
+        if self._opened_at is None and self._failures == 0:
+            return
+        with self._lock:
+            if self._opened_at is not None:
+                print("[OK] Database circuit breaker closed")
+            self._failures = 0
+            self._opened_at = None
+            self._probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self):
+        """Open immediately, e.g. when no server can take writes"""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self._opened_at is None:
+            print(f"[ERROR] Database circuit breaker opened after {self._failures} failures")
+        self._opened_at = time.monotonic()
+        self._probe_at = None
+
+class BreakerListener(monitoring.CommandListener, monitoring.TopologyListener,
+                      monitoring.ServerHeartbeatListener):
+    """Feeds command outcomes, heartbeats and topology changes from pymongo into a circuit breaker
+
+    Command and heartbeat events share the started/succeeded/failed hooks
+    and are told apart by type.
+    """
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self.writable = False
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if not isinstance(event, monitoring.ServerHeartbeatSucceededEvent):
+            self.breaker.record_success()
+
+    def failed(self, event):
+        if isinstance(event, monitoring.ServerHeartbeatFailedEvent):
+            # Server selection timeouts never produce a command event, so while
+            # no server can take writes every failed heartbeat counts instead
+            if not self.writable:
+                self.breaker.record_failure()
+            return
+
+        # Network errors carry errtype; server errors only count on maxTimeMS expiry
+        failure = event.failure or {}
+        if 'errtype' in failure or failure.get('code') == MAX_TIME_MS_EXPIRED:
+            self.breaker.record_failure()
+
+    def opened(self, event):
+        pass
+
+    def description_changed(self, event):
+        had_primary = event.previous_description.has_writable_server()
+        has_primary = event.new_description.has_writable_server()
+        self.writable = has_primary
+        if had_primary and not has_primary:
+            self.breaker.trip()
+        elif has_primary and not had_primary:
+            self.breaker.record_success()
+
+    def closed(self, event):
+        pass
 
 class Database:
-    """Database connection manager"""
+    """Database connection manager
+
+    The client is created lazily on first use and never blocks on the
+    network: pymongo opens connections in the background. Warm-up (ping,
+    indexes, caches) runs in a background thread and drives readiness.
+    """
     _instance = None
     _client = None
     _db = None
-    
+    _lock = threading.Lock()
+    _warmup_thread = None
+    ready = False
+    last_error = None
+    breaker = CircuitBreaker(Config.BREAKER_FAILURE_THRESHOLD, Config.BREAKER_RESET_TIMEOUT)
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
         return cls._instance
-    
+
     def connect(self):
-        """Establish connection to MongoDB"""
-        if self._client is None:
-            try:
-                mongo_uri = os.getenv('MONGO_URI')
-                database_name = os.getenv('DATABASE_NAME', 'poduim')
-                
-                if not mongo_uri:
-                    raise ValueError("MONGO_URI not found in environment variables")
-                
-                self._client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-                # Test connection
-                self._client.admin.command('ping')
-                self._db = self._client[database_name]
-                print(f"[OK] Successfully connected to MongoDB database: {database_name}")
-                
-            except ConnectionFailure as e:
-                print(f"[ERROR] Failed to connect to MongoDB: {e}")
-                raise
-            except Exception as e:
-                print(f"[ERROR] Error connecting to database: {e}")
-                raise
-        
+        """Create the MongoDB client once, safely across threads"""
+        with self._lock:
+            if self._db is None:
+                if not Config.MONGO_URI:
+                    raise ConfigurationError("MONGO_URI not found in environment variables")
+
+                self._client = MongoClient(
+                    Config.MONGO_URI,
+                    serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+                    socketTimeoutMS=Config.MONGO_SOCKET_TIMEOUT_MS,
+                    waitQueueTimeoutMS=Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                    minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+                    event_listeners=[BreakerListener(self.breaker)]
+                )
+                self._db = self._client[Config.DATABASE_NAME]
+
         return self._db
-    
+
     def get_database(self):
-        """Get database instance"""
+        """Get database instance, failing fast while the circuit breaker is open"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.retry_after())
         if self._db is None:
             return self.connect()
         return self._db
-    
+
+    def ping(self, timeout=1):
+        """Check that the server answers within timeout seconds"""
+        try:
+            with pymongo.timeout(timeout):
+                self.get_database().command('ping')
+            return True
+        except PyMongoError as e:
+            self.last_error = str(e)
+            return False
+
+    def start_warm_up(self, *tasks, retry_delay=2):
+        """Run warm-up tasks in a background thread, retrying until they succeed
+
+        Each task is a callable taking no arguments. The manager is marked
+        ready once the server answers a ping and every task has completed.
+        """
+        def run():
+            while True:
+                try:
+                    self.get_database().command('ping')
+                    for task in tasks:
+                        task()
+                    self.ready = True
+                    self.last_error = None
+                    print(f"[OK] Database warm-up complete: {Config.DATABASE_NAME}")
+                    return
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"[ERROR] Database warm-up failed, retrying in {retry_delay}s: {e}")
+                    time.sleep(retry_delay)
+
+        with self._lock:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = threading.Thread(target=run, name='db-warm-up', daemon=True)
+                self._warmup_thread.start()
+        return self._warmup_thread
+
     def close(self):
         """Close database connection"""
-        if self._client:
-            self._client.close()
-            self._client = None
-            self._db = None
-            print("[OK] Database connection closed")
+        with self._lock:
+            if self._client:
+                self._client.close()
+                self._client = None
+                self._db = None
+                self.ready = False
+                print("[OK] Database connection closed")
 
 # Global database instance
 db_manager = Database()
@@ -0,0 +1,240 @@
+from bson import ObjectId
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from config import Config
+from models.competition import collection_name, scope_filter, scoped_key
+from models.database import get_database
+
+class LeaderboardView:
+    """Materialized top-K leaderboards, one pre-ranked document per board.
+
+    Documents live in the `leaderboard_views` collection keyed by board:
+    `teams` for the team board, `users:<team_id>` for each team's user
+    board and `players` for the global player board (with team names).
+    Model write paths refresh a board only when the change can
+    affect its top K, so reads are a single find_one. Views belong to the
+    competition in scope, like the teams and users they are built from.
+
+    Each board carries a `version`, bumped when new entries are stored, and
+    a `skipped` count, bumped when a change is found not to affect that
+    version. A refresh stores its entries only if neither moved since it
+    read them, so it can never overwrite a board that a concurrent change
+    was checked against.
+    """
+
+    TEAMS_KEY = 'teams'
+    PLAYERS_KEY = 'players'
+
+    @staticmethod
+    def get_collection():
+        """Get leaderboard views collection for the current competition"""
+        db = get_database()
+        return db[collection_name('leaderboard_views')]
+
+    @staticmethod
+    def team_users_key(team_id):
+        """Key of the user board for a team"""
+        return f'users:{ObjectId(team_id)}'
+
+    @staticmethod
+    def exists(key):
+        """Check that a board has been materialized, without fetching it"""
+        view = LeaderboardView.get_collection().find_one(
+            {'_id': scoped_key(key)}, {'_id': 1}, max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        return view is not None
+    
+    @staticmethod
+    def get_version(key):
+        """Get a board's version token without fetching its entries, or None"""
+        view = LeaderboardView.get_collection().find_one(
+            {'_id': scoped_key(key)},
+            {'version': 1, 'updated_at': 1},
+            max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        if view is None:
+            return None
+        return (view.get('version'), view.get('updated_at'))
+
+    @staticmethod
+    def get_entries(key, projection=None):
+        """Get the ranked entries of a board, building it on first use
+
+        projection applies to the entries, e.g. {'name': 1, 'score': 1}.
+        Returns None for the user board of an unknown team.
+        """
+        view_projection = None
+        if projection:
+            view_projection = {f'entries.{field}': 1 for field, include in projection.items() if include}
+
+        view = LeaderboardView.get_collection().find_one(
+            {'_id': scoped_key(key)}, view_projection, max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        if view is None:
+            return LeaderboardView.refresh(key)
+        return view.get('entries', [])
+
+    @staticmethod
+    def refresh(key, attempts=3):
+        """Recompute a board from its source collection and store it
+
+        The write only lands if no other refresh stored the board since this
+        one read its version; otherwise the board is recomputed, so a slow
+        refresh never overwrites newer entries with older ones. Returns None,
+        without storing anything, for the user board of an unknown team.
+        """
+        entries = None
+        for _ in range(attempts):
+            view = LeaderboardView.get_collection().find_one(
+                {'_id': scoped_key(key)}, {'version': 1, 'skipped': 1}, max_time_ms=Config.MONGO_MAX_TIME_MS
+            )
+            
+            entries = LeaderboardView._compute(key)
+            if entries is None or LeaderboardView._store(key, entries, view):
+                return entries
+        
+        # Drop the board rather than leave it without this change
+        print(f"[ERROR] Leaderboard view {key} kept changing, gave up after {attempts} refreshes")
+        LeaderboardView.delete(key)
+        return entries
+    
+    @staticmethod
+    def _compute(key):
+        """Query the current top K for a board, or None for an unknown team"""
+        from models.team import Team
+        from models.user import User
+        
+        top_k = Config.LEADERBOARD_TOP_K
+        if key == LeaderboardView.TEAMS_KEY:
+            return list(Team.get_collection().find(
+                scope_filter(), max_time_ms=Config.MONGO_MAX_TIME_MS
+            ).sort(Team.LEADERBOARD_SORT).limit(top_k))
+        if key == LeaderboardView.PLAYERS_KEY:
+            return User.get_global_leaderboard(top_k)
+        
+        team_id = ObjectId(key.split(':', 1)[1])
+        if not Team.get_collection().find_one(
+            scope_filter({'_id': team_id}), {'_id': 1}, max_time_ms=Config.MONGO_MAX_TIME_MS
+        ):
+            return None
+        return list(User.get_collection().find(
+            scope_filter({'team_id': team_id}), max_time_ms=Config.MONGO_MAX_TIME_MS
+        ).sort([('score', -1), ('_id', 1)]).limit(top_k))
+    
+    @staticmethod
+    def _store(key, entries, view):
+        """Store entries if the board is unchanged since view was read (None: not created yet)"""
+        now = datetime.utcnow()
+        if view is None:
+            try:
+                LeaderboardView.get_collection().insert_one(
+                    {'_id': scoped_key(key), 'entries': entries, 'updated_at': now, 'version': 1}
+                )
+                return True
+            except DuplicateKeyError:
+                return False
+        
+        result = LeaderboardView.get_collection().update_one(
+            {'_id': scoped_key(key), 'version': view.get('version'), 'skipped': view.get('skipped')},
+            {'$set': {'entries': entries, 'updated_at': now}, '$inc': {'version': 1}}
+        )
+        return result.matched_count > 0
+    
+    @staticmethod
+    def _skip(key, view):
+        """Record a change as not affecting the board, if it is still at view's version
+
+        Bumping `skipped` makes any refresh that read the board before the
+        change retry, so it cannot store entries computed without it.
+        """
+        result = LeaderboardView.get_collection().update_one(
+            {'_id': scoped_key(key), 'version': view.get('version')},
+            {'$inc': {'skipped': 1}}
+        )
+        return result.matched_count > 0
+    
+    @staticmethod
+    def affects(view, doc_id, score=None):
+        """Check whether a change to doc_id (now scoring score) can alter a board.
+
+        A change matters when the board does not exist yet, the document is
+        already on it, it still has free slots, or the new score reaches the
+        current cut-off.
+        """
+        if view is None:
+            return True
+
+        entries = view.get('entries', [])
+        if any(entry['_id'] == doc_id for entry in entries):
+            return True
+        if len(entries) < Config.LEADERBOARD_TOP_K:
+            return True
+        return score is not None and score >= entries[-1].get('score', 0)
+
+    @staticmethod
+    def refresh_if_affected(key, doc_id, score=None, attempts=3):
+        """Refresh a board only when the change can affect its top K"""
+        try:
+            doc_id = ObjectId(doc_id)
+            for _ in range(attempts):
+                view = LeaderboardView.get_collection().find_one(
+                    {'_id': scoped_key(key)},
+                    {'entries._id': 1, 'entries.score': 1, 'version': 1},
+                    max_time_ms=Config.MONGO_MAX_TIME_MS
+                )
+                if LeaderboardView.affects(view, doc_id, score):
+                    break
+                if LeaderboardView._skip(key, view):
+                    return False
+            LeaderboardView.refresh(key)
+            return True
+        except Exception as e:
+            LeaderboardView.invalidate(key, e)
+        return False
+
+    @staticmethod
+    def refresh_if_team_listed(key, team_id, attempts=3):
+        """Refresh a board that shows data denormalized from team_id, e.g. its name"""
+        try:
+            team_id = ObjectId(team_id)
+            for _ in range(attempts):
+                view = LeaderboardView.get_collection().find_one(
+                    {'_id': scoped_key(key)},
+                    {'entries.team_id': 1, 'version': 1},
+                    max_time_ms=Config.MONGO_MAX_TIME_MS
+                )
+                if view is None or any(entry.get('team_id') == team_id for entry in view.get('entries', [])):
+                    break
+                if LeaderboardView._skip(key, view):
+                    return False
+            LeaderboardView.refresh(key)
+            return True
+        except Exception as e:
+            LeaderboardView.invalidate(key, e)
+        return False
+
+    @staticmethod
+    def invalidate(key, error):
+        """Drop a board whose refresh failed, so the next read rebuilds it"""
+        print(f"[ERROR] Failed to refresh leaderboard view {key}, dropping it: {error}")
+        try:
+            LeaderboardView.delete(key)
+        except Exception as e:
+            print(f"[ERROR] Failed to drop leaderboard view {key}: {e}")
+
+    @staticmethod
+    def delete(key):
+        """Drop a materialized board"""
+        LeaderboardView.get_collection().delete_one({'_id': scoped_key(key)})
+
+    @staticmethod
+    def refresh_all():
+        """Rebuild the team board and every team's user board"""
+        from models.team import Team
+
+        LeaderboardView.refresh(LeaderboardView.TEAMS_KEY)
+        LeaderboardView.refresh(LeaderboardView.PLAYERS_KEY)
+        team_ids = Team.get_collection().distinct('_id', scope_filter(), maxTimeMS=Config.MONGO_MAX_TIME_MS)
+        for team_id in team_ids:
+            LeaderboardView.refresh(LeaderboardView.team_users_key(team_id))
+        return len(team_ids)
@@ -0,0 +1,117 @@
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+from config import Config
+from models.competition import collection_name, current_competition, scope_filter, scoped_key
+from models.database import get_database
+
+# Server error codes for an unknown $group accumulator or expression
+UNKNOWN_GROUP_OPERATOR = 15952
+INVALID_PIPELINE_OPERATOR = 168
+
+class PercentileUnsupportedError(Exception):
+    """Raised when the server is too old for $percentile (MongoDB < 7.0)"""
+
+    def __init__(self):
+        super().__init__("Score percentiles require MongoDB 7.0 or later")
+
+class Stats:
+    """Score distribution statistics for users, per team and competition-wide
+
+    Every user score change bumps a version counter for the team and for the
+    competition-wide scope in `stats_versions`; results are recomputed only when the
+    version they were computed at is stale.
+    """
+
+    GLOBAL_SCOPE = 'global'
+
+    # Percentiles reported by compute(), as fractions
+    PERCENTILES = (0.5, 0.75, 0.9, 0.95, 0.99)
+
+    @staticmethod
+    def get_collection():
+        """Get stats versions collection for the current competition"""
+        db = get_database()
+        return db[collection_name('stats_versions')]
+
+    @staticmethod
+    def scope_for(team_id=None):
+        """Version scope key for a team, or the competition-wide scope"""
+        return scoped_key(f'team:{ObjectId(team_id)}' if team_id else Stats.GLOBAL_SCOPE)
+
+    @staticmethod
+    def cache_key(team_id=None):
+        """Process-wide cache key for a scope, unique across competitions"""
+        return (current_competition(), Stats.scope_for(team_id))
+
+    @staticmethod
+    def bump(*team_ids):
+        """Invalidate statistics for the given teams and the global scope"""
+        try:
+            scopes = [Stats.scope_for(team_id) for team_id in dict.fromkeys(team_ids)] + [Stats.scope_for()]
+            Stats.get_collection().bulk_write([
+                UpdateOne({'_id': scope}, {'$inc': {'version': 1}}, upsert=True)
+                for scope in scopes
+            ], ordered=False)
+        except Exception as e:
+            print(f"[ERROR] Failed to invalidate score statistics: {e}")
+
+    @staticmethod
+    def get_version(team_id=None):
+        """Current version of a scope (0 if it has never been written)"""
+        doc = Stats.get_collection().find_one(
+            {'_id': Stats.scope_for(team_id)}, max_time_ms=Config.MONGO_MAX_TIME_MS
+        )
+        return doc.get('version', 0) if doc else 0
+
+    @staticmethod
+    def compute(team_id=None, buckets=10):
+        """Aggregate count, mean, min/max, percentiles and a histogram of user scores
+
+        Percentiles use $percentile, which requires MongoDB 7.0 or later;
+        older servers raise PercentileUnsupportedError.
+        """
+        from models.user import User
+
+        match = scope_filter({'team_id': ObjectId(team_id)} if team_id else {})
+        pipeline = [
+            {'$match': match},
+            {'$facet': {
+                'summary': [{'$group': {
+                    '_id': None,
+                    'count': {'$sum': 1},
+                    'mean': {'$avg': '$score'},
+                    'min': {'$min': '$score'},
+                    'max': {'$max': '$score'},
+                    'percentiles': {'$percentile': {
+                        'input': '$score',
+                        'p': list(Stats.PERCENTILES),
+                        'method': 'approximate'
+                    }}
+                }}],
+                'histogram': [{'$bucketAuto': {'groupBy': '$score', 'buckets': buckets}}]
+            }}
+        ]
+        try:
+            result = next(User.get_collection().aggregate(pipeline, maxTimeMS=Config.MONGO_MAX_TIME_MS), {})
+        except OperationFailure as e:
+            if e.code in (UNKNOWN_GROUP_OPERATOR, INVALID_PIPELINE_OPERATOR) and '$percentile' in str(e):
+                raise PercentileUnsupportedError() from e
+            raise
+
+        summary = (result.get('summary') or [{}])[0]
+        percentiles = summary.get('percentiles') or [None] * len(Stats.PERCENTILES)
+        return {
+            'count': summary.get('count', 0),
+            'mean': summary.get('mean'),
+            'min': summary.get('min'),
+            'max': summary.get('max'),
+            'percentiles': {
+                f'p{round(p * 100)}': value
+                for p, value in zip(Stats.PERCENTILES, percentiles)
+            },
+            'histogram': [
+                {'min': bucket['_id']['min'], 'max': bucket['_id']['max'], 'count': bucket['count']}
+                for bucket in result.get('histogram', [])
+            ]
+        }
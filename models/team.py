@@ -1,41 +1,73 @@
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime
+import pymongo
+from pymongo import ReadPreference
+from config import Config
+from models.competition import collection_name, scope_document, scope_filter, scoped_index, scoped_index_name
 from models.database import get_database
+from models.leaderboard_view import LeaderboardView
 
 class Team:
     """Team model"""
     
+    # Fields clients may request with ?fields=
+    FIELDS = ('id', 'name', 'score', 'created_at')
+    
+    # Leaderboard sort order; _id breaks ties so cursors are deterministic
+    LEADERBOARD_SORT = [('score', -1), ('_id', 1)]
+    SCORE_INDEX = 'score_desc'
+    
     @staticmethod
     def get_collection():
-        """Get teams collection"""
+        """Get teams collection for the current competition"""
         db = get_database()
-        return db['teams']
+        return db[collection_name('teams')]
+    
+    @staticmethod
+    def create_indexes():
+        """Create indexes backing leaderboard queries"""
+        Team.get_collection().create_index(
+            scoped_index(Team.LEADERBOARD_SORT), name=scoped_index_name(Team.SCORE_INDEX)
+        )
+    
+    @staticmethod
+    def has_indexes():
+        """Check that leaderboard indexes exist"""
+        # listIndexes takes no maxTimeMS, so bound it with a client-side deadline
+        with pymongo.timeout(Config.MONGO_MAX_TIME_MS / 1000):
+            indexes = Team.get_collection().index_information()
+        return scoped_index_name(Team.SCORE_INDEX) in indexes
     
     @staticmethod
     def create(name):
         """Create a new team"""
-        team = {
+        team = scope_document({
             'name': name,
             'score': 0,
             'created_at': datetime.utcnow()
-        }
+        })
         result = Team.get_collection().insert_one(team)
         team['_id'] = result.inserted_id
+        LeaderboardView.refresh_if_affected(LeaderboardView.TEAMS_KEY, team['_id'], team['score'])
         return team
     
     @staticmethod
-    def get_all():
+    def get_all(projection=None):
         """Get all teams"""
-        teams = list(Team.get_collection().find())
+        teams = list(Team.get_collection().find(scope_filter(), projection, max_time_ms=Config.MONGO_MAX_TIME_MS))
         return teams
     
     @staticmethod
-    def get_by_id(team_id):
+    def get_by_id(team_id, projection=None):
         """Get team by ID"""
         try:
-            team = Team.get_collection().find_one({'_id': ObjectId(team_id)})
+            team = Team.get_collection().find_one(
+                scope_filter({'_id': ObjectId(team_id)}), projection, max_time_ms=Config.MONGO_MAX_TIME_MS
+            )
             return team
-        except Exception:
+        except (InvalidId, TypeError):
+            # Database errors propagate so routes can answer 503 instead of 404
             return None
     
     @staticmethod
@@ -49,20 +81,30 @@ class Team:
                 update_data['score'] = data['score']
             
             result = Team.get_collection().update_one(
-                {'_id': ObjectId(team_id)},
+                scope_filter({'_id': ObjectId(team_id)}),
                 {'$set': update_data}
             )
+            if result.modified_count > 0:
+                LeaderboardView.refresh_if_affected(
+                    LeaderboardView.TEAMS_KEY, team_id, update_data.get('score')
+                )
+                if 'name' in update_data:
+                    LeaderboardView.refresh_if_team_listed(LeaderboardView.PLAYERS_KEY, team_id)
             return result.modified_count > 0
-        except Exception:
+        except (InvalidId, TypeError):
             return False
     
     @staticmethod
     def delete(team_id):
         """Delete team"""
         try:
-            result = Team.get_collection().delete_one({'_id': ObjectId(team_id)})
+            result = Team.get_collection().delete_one(scope_filter({'_id': ObjectId(team_id)}))
+            if result.deleted_count > 0:
+                LeaderboardView.refresh_if_affected(LeaderboardView.TEAMS_KEY, team_id)
+                LeaderboardView.delete(LeaderboardView.team_users_key(team_id))
+                LeaderboardView.refresh_if_team_listed(LeaderboardView.PLAYERS_KEY, team_id)
             return result.deleted_count > 0
-        except Exception:
+        except (InvalidId, TypeError):
             return False
     
     @staticmethod
@@ -81,11 +123,14 @@ class Team:
             
             # Update team score
             result = Team.get_collection().update_one(
-                {'_id': ObjectId(team_id)},
+                scope_filter({'_id': ObjectId(team_id)}),
                 {'$set': {'score': total_score}}
             )
             print(f"[DEBUG] MongoDB update result: modified_count={result.modified_count}")
             
+            if result.modified_count > 0:
+                LeaderboardView.refresh_if_affected(LeaderboardView.TEAMS_KEY, team_id, total_score)
+            
             return total_score
         except Exception as e:
             print(f"[ERROR] Error updating team score: {e}")
@@ -94,7 +139,17 @@ class Team:
             return 0
     
     @staticmethod
-    def get_leaderboard():
-        """Get teams sorted by score (descending)"""
-        teams = list(Team.get_collection().find().sort('score', -1))
-        return teams
+    def get_leaderboard(projection=None):
+        """Get the top K teams sorted by score (descending) from the materialized view"""
+        return LeaderboardView.get_entries(LeaderboardView.TEAMS_KEY, projection)
+    
+    @staticmethod
+    def iter_leaderboard(batch_size=1000):
+        """Stream teams sorted by score from the score index.
+        
+        Reads prefer secondaries so large exports stay off the primary.
+        """
+        collection = Team.get_collection().with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED
+        )
+        return collection.find(scope_filter()).sort(Team.LEADERBOARD_SORT).hint(scoped_index_name(Team.SCORE_INDEX)).batch_size(batch_size)
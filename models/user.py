@@ -1,28 +1,73 @@
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime
+import pymongo
+from pymongo import ReadPreference
+from config import Config
+from models.competition import collection_name, scope_document, scope_filter, scoped_index, scoped_index_name
 from models.database import get_database
+from models.leaderboard_view import LeaderboardView
+from models.stats import Stats
 
 class User:
     """User model"""
     
+    # Fields clients may request with ?fields=
+    FIELDS = ('id', 'name', 'team_id', 'score', 'created_at')
+    
+    # Fields clients may request for the global player leaderboard
+    PLAYER_FIELDS = FIELDS + ('team_name',)
+    
+    # Per-team leaderboard sort order; _id breaks ties so cursors are deterministic
+    TEAM_LEADERBOARD_SORT = [('team_id', 1), ('score', -1), ('_id', 1)]
+    TEAM_SCORE_INDEX = 'team_score_desc'
+    
+    # Global player leaderboard sort order, also the keyset paging order
+    GLOBAL_LEADERBOARD_SORT = [('score', -1), ('_id', 1)]
+    SCORE_INDEX = 'score_desc'
+    
     @staticmethod
     def get_collection():
-        """Get users collection"""
+        """Get users collection for the current competition"""
         db = get_database()
-        return db['user']
+        return db[collection_name('user')]
+    
+    @staticmethod
+    def create_indexes():
+        """Create indexes backing team lookups and leaderboard queries"""
+        User.get_collection().create_index(
+            scoped_index(User.TEAM_LEADERBOARD_SORT), name=scoped_index_name(User.TEAM_SCORE_INDEX)
+        )
+        User.get_collection().create_index(
+            scoped_index(User.GLOBAL_LEADERBOARD_SORT), name=scoped_index_name(User.SCORE_INDEX)
+        )
+    
+    @staticmethod
+    def has_indexes():
+        """Check that leaderboard indexes exist"""
+        # listIndexes takes no maxTimeMS, so bound it with a client-side deadline
+        with pymongo.timeout(Config.MONGO_MAX_TIME_MS / 1000):
+            indexes = User.get_collection().index_information()
+        return (scoped_index_name(User.TEAM_SCORE_INDEX) in indexes
+                and scoped_index_name(User.SCORE_INDEX) in indexes)
     
     @staticmethod
     def create(name, team_id, score=0):
         """Create a new user"""
         try:
-            user = {
+            user = scope_document({
                 'name': name,
                 'team_id': ObjectId(team_id),
                 'score': score,
                 'created_at': datetime.utcnow()
-            }
+            })
             result = User.get_collection().insert_one(user)
             user['_id'] = result.inserted_id
+            LeaderboardView.refresh_if_affected(
+                LeaderboardView.team_users_key(team_id), user['_id'], score
+            )
+            LeaderboardView.refresh_if_affected(LeaderboardView.PLAYERS_KEY, user['_id'], score)
+            Stats.bump(team_id)
             
             print(f"[DEBUG] Created user '{name}' with score {score} for team {team_id}")
             
@@ -37,27 +82,33 @@ class User:
             raise
     
     @staticmethod
-    def get_all():
+    def get_all(projection=None):
         """Get all users"""
-        users = list(User.get_collection().find())
+        users = list(User.get_collection().find(scope_filter(), projection, max_time_ms=Config.MONGO_MAX_TIME_MS))
         return users
     
     @staticmethod
-    def get_by_id(user_id):
+    def get_by_id(user_id, projection=None):
         """Get user by ID"""
         try:
-            user = User.get_collection().find_one({'_id': ObjectId(user_id)})
+            user = User.get_collection().find_one(
+                scope_filter({'_id': ObjectId(user_id)}), projection, max_time_ms=Config.MONGO_MAX_TIME_MS
+            )
             return user
-        except Exception:
+        except (InvalidId, TypeError):
+            # Database errors propagate so routes can answer 503 instead of 404
             return None
     
     @staticmethod
     def get_by_team(team_id):
         """Get all users in a team"""
         try:
-            users = list(User.get_collection().find({'team_id': ObjectId(team_id)}))
+            users = list(User.get_collection().find(
+                scope_filter({'team_id': ObjectId(team_id)}), max_time_ms=Config.MONGO_MAX_TIME_MS
+            ))
             return users
-        except Exception:
+        except (InvalidId, TypeError):
+            # A failed read must not look like an empty team, or its score would be reset to 0
             return []
     
     @staticmethod
@@ -80,7 +131,7 @@ class User:
                 update_data['team_id'] = ObjectId(data['team_id'])
             
             result = User.get_collection().update_one(
-                {'_id': ObjectId(user_id)},
+                scope_filter({'_id': ObjectId(user_id)}),
                 {'$set': update_data}
             )
             
@@ -92,9 +143,25 @@ class User:
                 # If team changed, update new team score
                 if 'team_id' in data and str(old_team_id) != data['team_id']:
                     Team.update_score(data['team_id'])
+                
+                # Refresh the top-K user boards the change can reach
+                new_score = update_data.get('score', current_user.get('score', 0))
+                new_team_id = update_data.get('team_id', old_team_id)
+                LeaderboardView.refresh_if_affected(
+                    LeaderboardView.team_users_key(old_team_id), user_id, new_score
+                )
+                if new_team_id != old_team_id:
+                    LeaderboardView.refresh_if_affected(
+                        LeaderboardView.team_users_key(new_team_id), user_id, new_score
+                    )
+                LeaderboardView.refresh_if_affected(LeaderboardView.PLAYERS_KEY, user_id, new_score)
+                
+                # Only score changes and team moves alter the score distributions
+                if new_score != current_user.get('score', 0) or new_team_id != old_team_id:
+                    Stats.bump(old_team_id, new_team_id)
             
             return result.modified_count > 0
-        except Exception as e:
+        except (InvalidId, TypeError) as e:
             print(f"Error updating user: {e}")
             return False
     
@@ -109,28 +176,84 @@ class User:
             
             team_id = user.get('team_id')
             
-            result = User.get_collection().delete_one({'_id': ObjectId(user_id)})
+            result = User.get_collection().delete_one(scope_filter({'_id': ObjectId(user_id)}))
             
             # Update team score
             if result.deleted_count > 0:
                 from models.team import Team
                 Team.update_score(str(team_id))
+                LeaderboardView.refresh_if_affected(
+                    LeaderboardView.team_users_key(team_id), user_id
+                )
+                LeaderboardView.refresh_if_affected(LeaderboardView.PLAYERS_KEY, user_id)
+                Stats.bump(team_id)
             
             return result.deleted_count > 0
-        except Exception as e:
+        except (InvalidId, TypeError) as e:
             print(f"Error deleting user: {e}")
             return False
     
     @staticmethod
-    def get_leaderboard_by_team(team_id):
-        """Get users sorted by score for a specific team"""
+    def get_leaderboard_by_team(team_id, projection=None):
+        """Get the top K users sorted by score for a specific team from the materialized view
+
+        Returns None when the team does not exist.
+        """
         try:
-            print(f"[DEBUG] Querying users for team_id: {team_id}")
-            users = list(User.get_collection().find(
-                {'team_id': ObjectId(team_id)}
-            ).sort('score', -1))
-            print(f"[DEBUG] Found {len(users)} users")
-            return users
-        except Exception as e:
-            print(f"[ERROR] Error in get_leaderboard_by_team: {e}")
-            return []
+            return LeaderboardView.get_entries(LeaderboardView.team_users_key(team_id), projection)
+        except (InvalidId, TypeError):
+            # Database errors propagate so callers can fall back to a cached board
+            return None
+    
+    @staticmethod
+    def iter_leaderboard_by_team(team_id=None, batch_size=1000):
+        """Stream users sorted by team, then score, from the team/score index.
+        
+        Without team_id every team's board is streamed back to back.
+        Reads prefer secondaries so large exports stay off the primary.
+        """
+        query = scope_filter({'team_id': ObjectId(team_id)} if team_id else {})
+        collection = User.get_collection().with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED
+        )
+        return collection.find(query).sort(User.TEAM_LEADERBOARD_SORT).hint(scoped_index_name(User.TEAM_SCORE_INDEX)).batch_size(batch_size)
+    
+    @staticmethod
+    def attach_team_names(users):
+        """Set team_name on each user with one batched team lookup"""
+        from models.team import Team
+        
+        team_ids = list({user['team_id'] for user in users if user.get('team_id')})
+        names = {}
+        if team_ids:
+            teams = Team.get_collection().find(
+                scope_filter({'_id': {'$in': team_ids}}), {'name': 1}, max_time_ms=Config.MONGO_MAX_TIME_MS
+            )
+            names = {team['_id']: team.get('name') for team in teams}
+        
+        for user in users:
+            user['team_name'] = names.get(user.get('team_id'))
+        return users
+    
+    @staticmethod
+    def get_global_leaderboard(limit, after=None, projection=None):
+        """Get a page of users across all teams sorted by score, with team names
+        
+        after is the (score, _id) of the last user on the previous page; pages
+        are read straight from the score index (keyset paging, no skip).
+        """
+        query = {}
+        if after:
+            score, user_id = after
+            query = {'$or': [
+                {'score': {'$lt': score}},
+                {'score': score, '_id': {'$gt': user_id}}
+            ]}
+        
+        users = list(User.get_collection().find(
+            scope_filter(query), projection, max_time_ms=Config.MONGO_MAX_TIME_MS
+        ).sort(User.GLOBAL_LEADERBOARD_SORT).hint(scoped_index_name(User.SCORE_INDEX)).limit(limit))
+        
+        if projection is None or projection.get('team_id'):
+            User.attach_team_names(users)
+        return users
@@ -1,5 +1,9 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
+from models.competition import Competition
 from models.team import Team
+from models.leaderboard_view import LeaderboardView
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS, database_unavailable
+from utils.serializers import serialize_doc
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -16,10 +20,53 @@ def recalculate_all_scores():
             print(f"Updated team {team['name']}: score = {new_score}")
             updated += 1
         
+        # Rebuild materialized leaderboards from the recalculated scores
+        LeaderboardView.refresh_all()
+        
         return jsonify({
             'message': f'Successfully recalculated scores for {updated} teams',
             'teams_updated': updated
         }), 200
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/admin/competitions', methods=['POST'])
+def create_competition():
+    """Register a competition and create its indexes"""
+    try:
+        data = request.get_json()
+        
+        if not data or 'id' not in data:
+            return jsonify({'error': 'Competition id is required'}), 400
+        
+        competition = Competition.create(data['id'], data.get('name'))
+        if competition is None:
+            return jsonify({'error': 'Competition already exists'}), 409
+        
+        return jsonify(serialize_doc(competition)), 201
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/admin/competitions', methods=['GET'])
+def get_competitions():
+    """Get all registered competitions"""
+    try:
+        competitions = Competition.get_all()
+        return jsonify([serialize_doc(competition) for competition in competitions]), 200
+    
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,41 @@
+from flask import Blueprint, jsonify
+from models.database import db_manager
+from models.leaderboard_view import LeaderboardView
+from models.team import Team
+from models.user import User
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'ok'}), 200
+
+@health_bp.route('/readyz', methods=['GET'])
+def readiness():
+    """
+    Readiness probe: the instance can serve traffic at full speed
+    - Database reachable
+    - Leaderboard indexes present
+    - Leaderboard views warm
+    """
+    checks = {
+        'warm_up': db_manager.ready,
+        'database': db_manager.ping(),
+        'indexes': False,
+        'caches': False
+    }
+    
+    if checks['database']:
+        try:
+            checks['indexes'] = Team.has_indexes() and User.has_indexes()
+            checks['caches'] = LeaderboardView.exists(LeaderboardView.TEAMS_KEY)
+        except Exception as e:
+            db_manager.last_error = str(e)
+    
+    ready = all(checks.values())
+    body = {'status': 'ready' if ready else 'not ready', 'checks': checks}
+    if not ready and db_manager.last_error:
+        body['error'] = db_manager.last_error
+    
+    return jsonify(body), 200 if ready else 503
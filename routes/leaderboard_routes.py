@@ -1,42 +1,148 @@
-from flask import Blueprint, request, jsonify
+import threading
+from itertools import chain
+from bson import ObjectId
+from flask import Blueprint, Response, current_app, request, jsonify
+from config import Config
 from models.team import Team
 from models.user import User
-from utils.serializers import serialize_doc
+from utils.compression import choose_encoding
+from utils.export import rank_rows, stream_csv, stream_ndjson
+from utils.leaderboard import get_leaderboard_snapshot, get_players_page, get_players_snapshot, parse_page_limit
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS, database_unavailable
+from utils.serializers import parse_fields
 
 leaderboard_bp = Blueprint('leaderboard', __name__)
 
+# Caps concurrent exports so long-running cursors cannot starve live traffic
+_export_slots = threading.BoundedSemaphore(Config.EXPORT_MAX_CONCURRENT)
+
+EXPORT_COLUMNS = {
+    'teams': ['rank', 'id', 'name', 'score', 'created_at'],
+    'users': ['rank', 'id', 'name', 'team_id', 'score', 'created_at'],
+}
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
 @leaderboard_bp.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
     """
     Get leaderboard rankings
     - No parameters: Returns team leaderboard (sorted by score)
     - With team_id parameter: Returns user leaderboard for that team (sorted by score)
+    - fields parameter: comma-separated entry fields to return, e.g. id,name,score
     """
     try:
         team_id = request.args.get('team_id')
+        fields = parse_fields(request.args.get('fields'), User.FIELDS if team_id else Team.FIELDS)
+        
+        snapshot = get_leaderboard_snapshot(team_id, fields)
+        if snapshot is None:
+            return jsonify({'error': 'Team not found'}), 404
+        
+        return snapshot_response(snapshot)
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@leaderboard_bp.route('/api/leaderboard/players', methods=['GET'])
+def get_player_leaderboard():
+    """
+    Get the global player leaderboard across all teams, with team names
+    - limit: page size (1-100, default 50)
+    - cursor: next_cursor from the previous page
+    - fields: comma-separated entry fields to return, e.g. id,name,score,team_name
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'), User.PLAYER_FIELDS)
+        limit = parse_page_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor')
+        
+        # The top of the board comes from the materialized view; deeper
+        # pages are keyset queries on the score index
+        if cursor is None and limit <= Config.LEADERBOARD_TOP_K:
+            return snapshot_response(get_players_snapshot(fields, limit))
+        
+        return jsonify(get_players_page(fields, limit, cursor)), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def snapshot_response(snapshot):
+    """Serve a snapshot, using its cached compressed body when the client accepts one"""
+    encoding = choose_encoding(len(snapshot.body), current_app.config['COMPRESSION_MIN_SIZE'])
+    response = Response(snapshot.encode(encoding), status=200, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if snapshot.stale:
+        response.headers['Warning'] = '110 - "Response is Stale"'
+    return response
+
+@leaderboard_bp.route('/api/leaderboard/export', methods=['GET'])
+def export_leaderboard():
+    """
+    Stream a ranked leaderboard as CSV or NDJSON
+    - format: csv (default) or ndjson
+    - type: teams (default) or users
+    - team_id: restrict a users export to one team; otherwise every team's
+      board is streamed in turn with ranks restarting per team
+    """
+    export_format = request.args.get('format', 'csv')
+    export_type = request.args.get('type', 'teams')
+    team_id = request.args.get('team_id')
+    
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    if team_id:
+        export_type = 'users'
+    if export_type not in EXPORT_COLUMNS:
+        return jsonify({'error': 'type must be teams or users'}), 400
+    if team_id and not ObjectId.is_valid(team_id):
+        return jsonify({'error': 'Team not found'}), 404
+    
+    if not _export_slots.acquire(blocking=False):
+        response = jsonify({'error': 'Too many exports in progress, try again later'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    try:
+        batch_size = Config.EXPORT_BATCH_SIZE
+        if export_type == 'teams':
+            rows = rank_rows(Team.iter_leaderboard(batch_size=batch_size))
+        else:
+            cursor = User.iter_leaderboard_by_team(team_id, batch_size=batch_size)
+            rows = rank_rows(cursor, group_key='team_id')
         
-        if team_id:
-            # Get user leaderboard for specific team
-            users = User.get_leaderboard_by_team(team_id)
-            
-            if not users:
-                team = Team.get_by_id(team_id)
-                if not team:
-                    return jsonify({'error': 'Team not found'}), 404
-            
-            return jsonify({
-                'type': 'users',
-                'team_id': team_id,
-                'leaderboard': [serialize_doc(user) for user in users]
-            }), 200
+        if export_format == 'csv':
+            body = stream_csv(rows, EXPORT_COLUMNS[export_type])
         else:
-            # Get team leaderboard
-            teams = Team.get_leaderboard()
-            
-            return jsonify({
-                'type': 'teams',
-                'leaderboard': [serialize_doc(team) for team in teams]
-            }), 200
+            body = stream_ndjson(rows)
+        
+        # Run the query and pull the first chunk before sending headers, so
+        # errors (missing index, timeouts) still get an error status rather
+        # than a truncated 200
+        first_chunk = next(body, '')
+        
+        filename = f"leaderboard-{team_id or export_type}.{export_format}"
+        response = Response(chain([first_chunk], body), mimetype=EXPORT_MIMETYPES[export_format])
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.call_on_close(_export_slots.release)
+        return response
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        _export_slots.release()
+        return database_unavailable(e)
     except Exception as e:
+        _export_slots.release()
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,43 @@
+from flask import Blueprint, request, jsonify
+from bson import ObjectId
+from models.stats import PercentileUnsupportedError
+from models.team import Team
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS, database_unavailable
+from utils.stats import get_score_stats, parse_buckets
+
+stats_bp = Blueprint('stats', __name__)
+
+@stats_bp.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Get user score distribution statistics
+    - No parameters: Statistics across all users
+    - With team_id parameter: Statistics for that team's users
+    - buckets parameter: Number of histogram buckets (1-100, default 10)
+    """
+    try:
+        team_id = request.args.get('team_id')
+        buckets = parse_buckets(request.args.get('buckets'))
+        
+        if team_id and not ObjectId.is_valid(team_id):
+            return jsonify({'error': 'Team not found'}), 404
+        
+        stats = get_score_stats(team_id, buckets)
+        
+        if team_id and stats['count'] == 0 and not Team.get_by_id(team_id, {'_id': 1}):
+            return jsonify({'error': 'Team not found'}), 404
+        
+        return jsonify({
+            'scope': 'team' if team_id else 'global',
+            'team_id': team_id,
+            **stats
+        }), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except PercentileUnsupportedError as e:
+        return jsonify({'error': str(e)}), 501
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from models.team import Team
-from utils.serializers import serialize_doc
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS, database_unavailable
+from utils.serializers import build_projection, compile_serializer, parse_fields, serialize_doc
 
 team_bp = Blueprint('teams', __name__)
 
@@ -16,29 +17,47 @@ def create_team():
         team = Team.create(data['name'])
         return jsonify(serialize_doc(team)), 201
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @team_bp.route('/api/teams', methods=['GET'])
 def get_teams():
-    """Get all teams"""
+    """Get all teams, optionally limited to ?fields=id,name,score"""
     try:
-        teams = Team.get_all()
-        return jsonify([serialize_doc(team) for team in teams]), 200
+        fields = parse_fields(request.args.get('fields'), Team.FIELDS)
+        serialize = compile_serializer(fields)
+        teams = Team.get_all(build_projection(fields))
+        return jsonify([serialize(team) for team in teams]), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @team_bp.route('/api/teams/<team_id>', methods=['GET'])
 def get_team(team_id):
-    """Get a specific team"""
+    """Get a specific team, optionally limited to ?fields="""
     try:
-        team = Team.get_by_id(team_id)
+        fields = parse_fields(request.args.get('fields'), Team.FIELDS)
+        team = Team.get_by_id(team_id, build_projection(fields))
         
         if not team:
             return jsonify({'error': 'Team not found'}), 404
         
-        return jsonify(serialize_doc(team)), 200
+        return jsonify(compile_serializer(fields)(team)), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -60,6 +79,9 @@ def update_team(team_id):
         team = Team.get_by_id(team_id)
         return jsonify(serialize_doc(team)), 200
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -74,5 +96,8 @@ def delete_team(team_id):
         
         return jsonify({'message': 'Team deleted successfully'}), 200
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from models.user import User
-from utils.serializers import serialize_doc
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS, database_unavailable
+from utils.serializers import build_projection, compile_serializer, parse_fields, serialize_doc
 
 user_bp = Blueprint('users', __name__)
 
@@ -29,29 +30,47 @@ def create_user():
         
         return jsonify(serialize_doc(user)), 201
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/api/users', methods=['GET'])
 def get_users():
-    """Get all users"""
+    """Get all users, optionally limited to ?fields=id,name,score"""
     try:
-        users = User.get_all()
-        return jsonify([serialize_doc(user) for user in users]), 200
+        fields = parse_fields(request.args.get('fields'), User.FIELDS)
+        serialize = compile_serializer(fields)
+        users = User.get_all(build_projection(fields))
+        return jsonify([serialize(user) for user in users]), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/api/users/<user_id>', methods=['GET'])
 def get_user(user_id):
-    """Get a specific user"""
+    """Get a specific user, optionally limited to ?fields="""
     try:
-        user = User.get_by_id(user_id)
+        fields = parse_fields(request.args.get('fields'), User.FIELDS)
+        user = User.get_by_id(user_id, build_projection(fields))
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify(serialize_doc(user)), 200
+        return jsonify(compile_serializer(fields)(user)), 200
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -76,6 +95,9 @@ def update_user(user_id):
         user = User.get_by_id(user_id)
         return jsonify(serialize_doc(user)), 200
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -93,5 +115,8 @@ def delete_user(user_id):
         
         return jsonify({'message': 'User deleted successfully'}), 200
     
+    except DATABASE_UNAVAILABLE_ERRORS as e:
+        return database_unavailable(e)
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
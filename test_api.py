@@ -114,6 +114,137 @@ def test_leaderboard():
         print(f"✗ Failed to get leaderboard: {response.status_code}")
         return False
 
+def test_team_boards():
+    """Test boards of an empty team and of an unknown team"""
+    print_section("TEST 6: Empty and Unknown Team Boards")
+    
+    team = requests.post(f"{API_BASE}/api/teams", json={"name": "Empty Team"}).json()
+    empty = requests.get(f"{API_BASE}/api/leaderboard", params={"team_id": team['id']})
+    unknown = requests.get(f"{API_BASE}/api/leaderboard", params={"team_id": "0" * 24})
+    requests.delete(f"{API_BASE}/api/teams/{team['id']}")
+    
+    if empty.status_code == 200 and empty.json()['leaderboard'] == [] and unknown.status_code == 404:
+        print("✓ Empty team returns an empty board, unknown team returns 404")
+        return True
+    print(f"✗ Unexpected responses: empty={empty.status_code}, unknown={unknown.status_code}")
+    return False
+
+def test_export(team_id):
+    """Test streaming a ranked export"""
+    print_section("TEST 7: Export Team Users as CSV")
+    
+    response = requests.get(
+        f"{API_BASE}/api/leaderboard/export",
+        params={"format": "csv", "team_id": team_id}
+    )
+    
+    if response.status_code != 200:
+        print(f"✗ Failed to export leaderboard: {response.status_code}")
+        return False
+    
+    lines = response.text.strip().splitlines()
+    header, rows = lines[0].split(','), [line.split(',') for line in lines[1:]]
+    ranks = [int(row[header.index('rank')]) for row in rows]
+    if header[0] == 'rank' and ranks == sorted(ranks) and len(rows) == 2:
+        print(f"✓ Export streamed {len(rows)} ranked rows")
+        return True
+    print(f"✗ Unexpected export: {response.text[:200]}")
+    return False
+
+def test_health():
+    """Test liveness and readiness probes"""
+    print_section("TEST 8: Health Probes")
+    
+    live = requests.get(f"{API_BASE}/healthz")
+    ready = requests.get(f"{API_BASE}/readyz")
+    checks = ready.json().get('checks', {})
+    
+    if live.status_code == 200 and ready.status_code == 200 and all(checks.values()):
+        print(f"✓ Live and ready: {checks}")
+        return True
+    print(f"✗ Not ready: healthz={live.status_code}, readyz={ready.status_code} {ready.text}")
+    return False
+
+def test_sparse_fields(team_id):
+    """Test ?fields= sparse fieldsets"""
+    print_section("TEST 9: Sparse Fieldsets")
+    
+    sparse = requests.get(f"{API_BASE}/api/teams/{team_id}", params={"fields": "id,score"})
+    unknown = requests.get(f"{API_BASE}/api/teams/{team_id}", params={"fields": "id,password"})
+    
+    if sparse.status_code == 200 and set(sparse.json()) == {"id", "score"} and unknown.status_code == 400:
+        print(f"✓ Sparse team: {sparse.json()}")
+        return True
+    print(f"✗ Unexpected responses: {sparse.status_code} {sparse.text}, unknown={unknown.status_code}")
+    return False
+
+def test_stats(team_id):
+    """Test score distribution statistics for a team"""
+    print_section("TEST 10: Score Statistics")
+    
+    response = requests.get(f"{API_BASE}/api/stats", params={"team_id": team_id, "buckets": 2})
+    
+    if response.status_code == 501:
+        print(f"✓ Percentiles unsupported by this server: {response.json()['error']}")
+        return True
+    if response.status_code != 200:
+        print(f"✗ Failed to get stats: {response.status_code} {response.text}")
+        return False
+    
+    stats = response.json()
+    if stats['count'] == 2 and stats['min'] == 150 and stats['max'] == 200 and len(stats['histogram']) <= 2:
+        print(f"✓ Stats: count={stats['count']}, mean={stats['mean']}, p50={stats['percentiles']['p50']}")
+        return True
+    print(f"✗ Unexpected stats: {stats}")
+    return False
+
+def test_players():
+    """Test the global player leaderboard and its keyset paging"""
+    print_section("TEST 11: Global Player Leaderboard")
+    
+    first = requests.get(f"{API_BASE}/api/leaderboard/players", params={"limit": 1})
+    invalid = requests.get(f"{API_BASE}/api/leaderboard/players", params={"limit": 0})
+    if first.status_code != 200 or invalid.status_code != 400:
+        print(f"✗ Unexpected responses: first={first.status_code}, invalid={invalid.status_code}")
+        return False
+    
+    page = first.json()
+    second = requests.get(
+        f"{API_BASE}/api/leaderboard/players",
+        params={"limit": 1, "cursor": page['next_cursor']}
+    ).json()
+    top, runner_up = page['leaderboard'][0], second['leaderboard'][0]
+    
+    if top['id'] != runner_up['id'] and top['score'] >= runner_up['score'] and 'team_name' in top:
+        print(f"✓ 1. {top['name']} ({top['team_name']}) - {top['score']} pts")
+        print(f"✓ 2. {runner_up['name']} ({runner_up['team_name']}) - {runner_up['score']} pts")
+        return True
+    print(f"✗ Unexpected pages: {page} / {second}")
+    return False
+
+def test_competitions():
+    """Test registering a competition and scoping requests to it"""
+    print_section("TEST 12: Competitions")
+    
+    created = requests.post(
+        f"{API_BASE}/api/admin/competitions",
+        json={"id": "test-cup", "name": "Test Cup"}
+    )
+    if created.status_code not in (201, 409):
+        print(f"✗ Failed to register competition: {created.status_code}")
+        return False
+    
+    scoped = requests.get(f"{API_BASE}/api/leaderboard", params={"competition": "test-cup"})
+    unknown = requests.get(f"{API_BASE}/api/leaderboard", params={"competition": "no-such-cup"})
+    invalid = requests.get(f"{API_BASE}/api/leaderboard", params={"competition": "../x"})
+    
+    if scoped.status_code == 200 and unknown.status_code == 404 and invalid.status_code == 400:
+        print("✓ Registered competition served; unknown id 404, invalid id 400")
+        return True
+    print(f"✗ Unexpected responses: scoped={scoped.status_code}, "
+          f"unknown={unknown.status_code}, invalid={invalid.status_code}")
+    return False
+
 def main():
     print("\n" + "🚀 PODIUM API TEST SUITE" + "\n")
     print("Testing automatic team score calculation...")
@@ -138,29 +269,50 @@ def main():
         else:
             print(f"  ✗ Score is incorrect! Expected 100, got {score1}")
         
-        # Test 4: Create second user
+        # Test 2: Create second user
         user2_id = test_create_user(team_id, "Bob", 150)
         
-        # Test 5: Check team score again (should be 250)
+        # Test 3: Check team score again (should be 250)
         score2 = test_get_team(team_id)
         if score2 == 250:
             print("  ✓ Score is correct: 250")
         else:
             print(f"  ✗ Score is incorrect! Expected 250, got {score2}")
         
-        # Test 6: Update user score
+        # Test 4: Update user score
         test_update_user(user1_id, 200)
         
-        # Test 7: Check team score after update (should be 350)
+        # Test 3: Check team score after update (should be 350)
         score3 = test_get_team(team_id)
         if score3 == 350:
             print("  ✓ Score is correct: 350")
         else:
             print(f"  ✗ Score is incorrect! Expected 350, got {score3}")
         
-        # Test 8: Get leaderboard
+        # Test 5: Get leaderboard
         test_leaderboard()
         
+        # Test 6: Empty and unknown team boards
+        test_team_boards()
+        
+        # Test 7: Export the team's users
+        test_export(team_id)
+        
+        # Test 8: Health probes
+        test_health()
+        
+        # Test 9: Sparse fieldsets
+        test_sparse_fields(team_id)
+        
+        # Test 10: Score statistics
+        test_stats(team_id)
+        
+        # Test 11: Global player leaderboard
+        test_players()
+        
+        # Test 12: Competition registry
+        test_competitions()
+        
         print_section("✅ ALL TESTS COMPLETED")
         print("\nSummary:")
         print(f"  - Team created: {team_id}")
@@ -0,0 +1,54 @@
+"""The asyncio (ASGI) app's native leaderboard route"""
+
+import asyncio
+import pytest
+
+pytest.importorskip('motor')
+pytest.importorskip('socketio')
+
+import asgi
+from utils.leaderboard import Snapshot
+
+async def call(path, headers=(), query_string=b''):
+    """Run one GET through asgi.app, returning (status, headers)"""
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': query_string,
+        'http_version': '1.1', 'headers': list(headers),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi.app(scope, receive, send)
+    start = messages[0]
+    return start['status'], dict(start['headers'])
+
+@pytest.fixture
+def board(monkeypatch):
+    """Serve a fixed team board without MongoDB"""
+    async def snapshot(team_id=None, fields=None):
+        return Snapshot({'type': 'teams', 'leaderboard': []}, version=(1, None))
+
+    monkeypatch.setattr(asgi, 'get_leaderboard_snapshot_async', snapshot)
+
+def test_leaderboard_allows_any_origin(board):
+    status, headers = asyncio.run(call('/api/leaderboard'))
+    assert status == 200
+    assert headers[b'access-control-allow-origin'] == b'*'
+
+def test_leaderboard_echoes_the_origin_like_flask_cors(board):
+    origin = (b'origin', b'http://localhost:3000')
+    status, headers = asyncio.run(call('/api/leaderboard', [origin]))
+    _, flask_headers = asyncio.run(call('/api/teams', [origin]))
+    assert status == 200
+    assert headers[b'access-control-allow-origin'] == flask_headers[b'access-control-allow-origin']
+    assert headers[b'vary'] == b'Accept-Encoding, Origin'
+
+def test_leaderboard_errors_carry_cors_headers(board):
+    status, headers = asyncio.run(call('/api/leaderboard', query_string=b'fields=nope'))
+    assert status == 400
+    assert headers[b'access-control-allow-origin'] == b'*'
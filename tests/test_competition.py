@@ -0,0 +1,69 @@
+"""Competition scoping of collections, queries, indexes and keys"""
+
+import pytest
+from config import Config
+from models.competition import (
+    CompetitionNotFoundError, collection_name, competition_scope, current_competition, room_for, scope_document,
+    scope_filter, scoped_index, scoped_index_name, scoped_key, validate_competition_id
+)
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Switch COMPETITION_STORAGE for one test"""
+    return lambda mode: monkeypatch.setattr(Config, 'COMPETITION_STORAGE', mode)
+
+def test_default_competition_outside_a_scope():
+    assert current_competition() == Config.DEFAULT_COMPETITION
+
+def test_scopes_nest_and_restore():
+    with competition_scope('spring-cup'):
+        with competition_scope('finals'):
+            assert current_competition() == 'finals'
+        assert current_competition() == 'spring-cup'
+    assert current_competition() == Config.DEFAULT_COMPETITION
+
+@pytest.mark.parametrize('competition_id', ['', 'a' * 65, 'teams.x', '../x', None, 42])
+def test_invalid_competition_ids_are_rejected(competition_id):
+    with pytest.raises(ValueError):
+        validate_competition_id(competition_id)
+
+def test_collection_storage_suffixes_collections(storage):
+    storage('collection')
+    assert collection_name('teams') == 'teams'
+    with competition_scope('cup'):
+        assert collection_name('teams') == 'teams__cup'
+        assert scope_filter({'score': 1}) == {'score': 1}
+        assert scope_document({}) == {}
+        assert scoped_index([('score', -1)]) == [('score', -1)]
+        assert scoped_index_name('score_desc') == 'score_desc'
+        assert scoped_key('teams') == 'teams'
+
+def test_shared_storage_tags_documents_queries_and_indexes(storage):
+    storage('shared')
+    with competition_scope('cup'):
+        assert collection_name('teams') == 'teams'
+        assert scope_filter({'score': 1}) == {'competition_id': 'cup', 'score': 1}
+        assert scope_document({'name': 'x'}) == {'name': 'x', 'competition_id': 'cup'}
+        assert scoped_index([('score', -1)]) == [('competition_id', 1), ('score', -1)]
+        assert scoped_key('teams') == 'cup/teams'
+
+def test_shared_indexes_do_not_reuse_unprefixed_names(storage):
+    storage('shared')
+    assert scoped_index_name('score_desc') != 'score_desc'
+
+def test_rooms_are_per_competition():
+    assert room_for('cup') != room_for('finals')
+
+def test_invalid_competition_is_rejected_before_the_registry_lookup():
+    from utils.competition import requested_competition
+    with pytest.raises(ValueError, match='competition'):
+        requested_competition({'competition': '../x'})
+
+def test_default_competition_needs_no_registration():
+    from utils.competition import requested_competition
+    assert requested_competition({}) == Config.DEFAULT_COMPETITION
+
+def test_unknown_competition_error_is_a_value_error():
+    error = CompetitionNotFoundError('cup')
+    assert isinstance(error, ValueError)
+    assert 'cup' in str(error)
@@ -0,0 +1,52 @@
+"""Response compression and encoding negotiation"""
+
+import gzip
+from flask import Flask, jsonify
+from utils import compression
+from utils.compression import available_encodings, choose_encoding, compress, init_compression
+
+def test_small_bodies_are_not_compressed():
+    assert choose_encoding(100, 1024, 'gzip, br') is None
+
+def test_best_accepted_encoding_is_chosen():
+    assert choose_encoding(4096, 1024, 'gzip') == 'gzip'
+    assert choose_encoding(4096, 1024, 'gzip, br') == available_encodings()[0]
+
+def test_unsupported_encodings_fall_back_to_identity():
+    assert choose_encoding(4096, 1024, 'identity') is None
+    assert choose_encoding(4096, 1024, '') is None
+
+def test_gzip_round_trip():
+    data = b'{"leaderboard": []}' * 100
+    assert gzip.decompress(compress(data, 'gzip')) == data
+
+def test_brotli_round_trip():
+    if compression.brotli is None:
+        return
+    data = b'{"leaderboard": []}' * 100
+    assert compression.brotli.decompress(compress(data, 'br')) == data
+
+def make_app():
+    app = Flask(__name__)
+    app.config['COMPRESSION_MIN_SIZE'] = 64
+    init_compression(app)
+
+    @app.route('/big')
+    def big():
+        return jsonify({'leaderboard': ['x' * 10] * 50})
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    return app
+
+def test_large_json_responses_are_compressed():
+    response = make_app().test_client().get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert b'leaderboard' in gzip.decompress(response.data)
+
+def test_small_responses_are_sent_as_is():
+    response = make_app().test_client().get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,118 @@
+"""Circuit breaker state transitions and the pymongo events that drive it"""
+
+from types import SimpleNamespace
+import pytest
+from pymongo import monitoring
+from pymongo.errors import ConfigurationError
+from models import database
+from models.database import MAX_TIME_MS_EXPIRED, BreakerListener, CircuitBreaker
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the database module"""
+    now = [1000.0]
+    monkeypatch.setattr(database.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+    assert breaker.retry_after() == 11
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert not breaker.is_open
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert not breaker.allow()
+
+def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+    assert breaker.retry_after() == 0
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10)
+    breaker.trip()
+    clock[0] += 10
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+
+def test_lost_probe_is_rearmed(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+    clock[0] += 10
+    assert breaker.allow()
+
+def command_failed(failure):
+    return SimpleNamespace(failure=failure)
+
+def topology_changed(had_writable, has_writable):
+    description = lambda writable: SimpleNamespace(has_writable_server=lambda: writable)
+    return SimpleNamespace(previous_description=description(had_writable), new_description=description(has_writable))
+
+def heartbeat_failed():
+    return monitoring.ServerHeartbeatFailedEvent(0.1, ConnectionError('refused'), ('db', 27017))
+
+def test_network_errors_and_timeouts_count_as_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    listener = BreakerListener(breaker)
+    listener.failed(command_failed({'errtype': 'AutoReconnect'}))
+    listener.failed(command_failed({'code': MAX_TIME_MS_EXPIRED}))
+    assert breaker.is_open
+
+def test_other_server_errors_do_not_count(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    BreakerListener(breaker).failed(command_failed({'code': 11000, 'errmsg': 'duplicate key'}))
+    assert not breaker.is_open
+
+def test_heartbeat_failures_count_while_nothing_is_writable(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    listener = BreakerListener(breaker)
+    listener.failed(heartbeat_failed())
+    listener.failed(heartbeat_failed())
+    assert breaker.is_open
+
+def test_heartbeat_failures_are_ignored_while_a_primary_is_up(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    listener = BreakerListener(breaker)
+    listener.description_changed(topology_changed(False, True))
+    listener.failed(heartbeat_failed())
+    assert not breaker.is_open
+
+def test_losing_and_regaining_the_primary(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10)
+    listener = BreakerListener(breaker)
+    listener.description_changed(topology_changed(True, False))
+    assert breaker.is_open
+    listener.description_changed(topology_changed(False, True))
+    assert not breaker.is_open
+
+def test_missing_uri_is_a_configuration_error_not_a_client_error(monkeypatch):
+    monkeypatch.setattr(database.Config, 'MONGO_URI', '')
+    manager = database.Database()
+    monkeypatch.setattr(manager, '_db', None)
+    with pytest.raises(ConfigurationError) as raised:
+        manager.connect()
+    assert not isinstance(raised.value, ValueError)
@@ -0,0 +1,51 @@
+"""Ranking and streaming helpers behind /api/leaderboard/export"""
+
+import csv
+import io
+import json
+import pytest
+
+pytest.importorskip('bson')
+
+from bson import ObjectId
+from utils.export import rank_rows, stream_csv, stream_ndjson
+
+def make_doc(score, **fields):
+    return {'_id': ObjectId(), 'name': f'player-{score}', 'score': score, **fields}
+
+def test_ties_share_a_rank_and_the_next_rank_skips():
+    docs = [make_doc(s) for s in (300, 200, 200, 100)]
+    assert [row['rank'] for row in rank_rows(docs)] == [1, 2, 2, 4]
+
+def test_ranks_restart_per_group():
+    team_a, team_b = ObjectId(), ObjectId()
+    docs = [
+        make_doc(50, team_id=team_a),
+        make_doc(50, team_id=team_a),
+        make_doc(90, team_id=team_b),
+        make_doc(10, team_id=team_b),
+    ]
+    assert [row['rank'] for row in rank_rows(docs, group_key='team_id')] == [1, 1, 1, 2]
+
+def test_rows_are_serialized():
+    doc = make_doc(10)
+    row = next(rank_rows([doc]))
+    assert row['id'] == str(doc['_id'])
+    assert '_id' not in row
+
+def test_stream_csv_writes_header_once_and_chunks_rows():
+    rows = [{'rank': i, 'name': f'p{i}', 'extra': 'ignored'} for i in range(1, 6)]
+    chunks = list(stream_csv(rows, ['rank', 'name'], chunk_size=2))
+
+    assert len(chunks) == 3
+    parsed = list(csv.DictReader(io.StringIO(''.join(chunks))))
+    assert [row['name'] for row in parsed] == ['p1', 'p2', 'p3', 'p4', 'p5']
+    assert list(parsed[0]) == ['rank', 'name']
+
+def test_stream_csv_without_rows_yields_header():
+    assert list(stream_csv([], ['rank', 'name'])) == ['rank,name\r\n']
+
+def test_stream_ndjson_emits_one_object_per_line():
+    rows = [{'rank': 1}, {'rank': 2}, {'rank': 3}]
+    body = ''.join(stream_ndjson(rows, chunk_size=2))
+    assert [json.loads(line) for line in body.splitlines()] == rows
@@ -0,0 +1,65 @@
+"""Player leaderboard cursors, page sizes and sliced snapshots"""
+
+import base64
+import json
+import pytest
+from bson import ObjectId
+from utils.leaderboard import PLAYER_PAGE_MAX, PlayerBoard, decode_cursor, encode_cursor, parse_page_limit
+
+def make_players(count):
+    return [{'_id': ObjectId(), 'name': f'p{i}', 'score': 1000 - i} for i in range(count)]
+
+def test_cursor_round_trip():
+    doc = make_players(1)[0]
+    assert decode_cursor(encode_cursor(doc)) == (doc['score'], doc['_id'])
+
+def test_cursor_is_url_safe():
+    assert set(encode_cursor(make_players(1)[0])) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=')
+
+def raw_cursor(score, user_id):
+    return base64.urlsafe_b64encode(json.dumps([score, user_id]).encode('utf-8')).decode('ascii')
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor', 'W10=', encode_cursor({'score': 1, '_id': 'nope'}),
+    raw_cursor({'$gt': -1}, str(ObjectId())), raw_cursor(True, str(ObjectId())),
+    raw_cursor('10', str(ObjectId())), raw_cursor(None, str(ObjectId())),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_page_limit_defaults_and_bounds():
+    assert parse_page_limit(None) == 50
+    assert parse_page_limit('') == 50
+    assert parse_page_limit('1') == 1
+    assert parse_page_limit(PLAYER_PAGE_MAX) == PLAYER_PAGE_MAX
+
+@pytest.mark.parametrize('value', [0, -5, PLAYER_PAGE_MAX + 1, 'ten', [10]])
+def test_page_limit_out_of_range_is_rejected(value):
+    with pytest.raises(ValueError):
+        parse_page_limit(value)
+
+def test_board_pages_are_slices_with_cursors():
+    players = make_players(5)
+    board = PlayerBoard(players, ('name',), version=(1, None))
+
+    page = board.page(2)
+    assert page.payload['leaderboard'] == [{'name': 'p0'}, {'name': 'p1'}]
+    assert decode_cursor(page.payload['next_cursor']) == (players[1]['score'], players[1]['_id'])
+    assert json.loads(page.body) == page.payload
+
+def test_short_board_has_no_next_cursor():
+    board = PlayerBoard(make_players(3), None)
+    assert board.page(10).payload['next_cursor'] is None
+    assert len(board.page(10).payload['leaderboard']) == 3
+
+def test_pages_are_encoded_once_per_board():
+    board = PlayerBoard(make_players(5), None)
+    assert board.page(3) is board.page(3)
+
+def test_stale_boards_serve_stale_pages():
+    board = PlayerBoard(make_players(5), None)
+    fresh = board.page(2)
+    stale = board.as_stale().page(2)
+    assert stale.stale and not fresh.stale
+    assert stale.body == fresh.body
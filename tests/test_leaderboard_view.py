@@ -0,0 +1,142 @@
+"""Materialized view refreshes: top-K checks, conditional stores and invalidation"""
+
+import copy
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, ExecutionTimeout
+from config import Config
+from models.leaderboard_view import LeaderboardView
+
+KEY = LeaderboardView.TEAMS_KEY
+
+class FakeViews:
+    """Just enough of a pymongo collection for LeaderboardView"""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query, projection=None, max_time_ms=None):
+        doc = self.docs.get(query['_id'])
+        return copy.deepcopy(doc)
+
+    def insert_one(self, doc):
+        if doc['_id'] in self.docs:
+            raise DuplicateKeyError('duplicate key')
+        self.docs[doc['_id']] = copy.deepcopy(doc)
+
+    def update_one(self, query, update):
+        doc = self.docs.get(query['_id'])
+        matched = doc is not None and all(doc.get(field) == value for field, value in query.items())
+        if matched:
+            doc.update(update.get('$set', {}))
+            for field, amount in update.get('$inc', {}).items():
+                doc[field] = doc.get(field, 0) + amount
+        return type('UpdateResult', (), {'matched_count': int(matched)})()
+
+    def delete_one(self, query):
+        self.docs.pop(query['_id'], None)
+
+@pytest.fixture
+def views(monkeypatch):
+    """A stubbed views collection and a board computed from state['entries']"""
+    collection = FakeViews()
+    state = {'entries': [], 'computed': 0, 'during_compute': None}
+
+    def compute(key):
+        state['computed'] += 1
+        entries = copy.deepcopy(state['entries'])
+        during_compute, state['during_compute'] = state['during_compute'], None
+        if during_compute:
+            during_compute()
+        return entries
+
+    monkeypatch.setattr(LeaderboardView, 'get_collection', staticmethod(lambda: collection))
+    monkeypatch.setattr(LeaderboardView, '_compute', staticmethod(compute))
+    monkeypatch.setattr(Config, 'LEADERBOARD_TOP_K', 2)
+    state['collection'] = collection
+    return state
+
+def board(*scores):
+    return {'entries': [{'_id': ObjectId(), 'score': score} for score in scores], 'version': 1}
+
+def test_changes_that_cannot_reach_the_top_k_do_not_affect_it(views):
+    view = board(300, 200)
+    assert not LeaderboardView.affects(view, ObjectId(), 100)
+    assert not LeaderboardView.affects(view, ObjectId())
+
+def test_changes_affect_missing_boards_listed_documents_and_the_cut_off(views):
+    view = board(300, 200)
+    assert LeaderboardView.affects(None, ObjectId(), 0)
+    assert LeaderboardView.affects(view, view['entries'][0]['_id'], 0)
+    assert LeaderboardView.affects(view, ObjectId(), 200)
+    assert LeaderboardView.affects(board(300), ObjectId(), 0)
+
+def test_refresh_creates_then_versions_the_board(views):
+    LeaderboardView.refresh(KEY)
+    assert views['collection'].docs[KEY]['version'] == 1
+    LeaderboardView.refresh(KEY)
+    assert views['collection'].docs[KEY]['version'] == 2
+
+def test_refresh_does_not_overwrite_a_board_stored_meanwhile(views):
+    LeaderboardView.refresh(KEY)
+    views['during_compute'] = lambda: LeaderboardView._store(
+        KEY, [{'newer': True}], views['collection'].find_one({'_id': KEY})
+    )
+    LeaderboardView.refresh(KEY)
+    assert views['computed'] == 3
+    assert views['collection'].docs[KEY]['version'] == 3
+    assert views['collection'].docs[KEY]['entries'] == []
+
+def test_refresh_retries_when_a_change_was_skipped_meanwhile(views):
+    views['entries'] = board(300, 200)['entries']
+    LeaderboardView.refresh(KEY)
+
+    def skipped_change():
+        assert not LeaderboardView.refresh_if_affected(KEY, ObjectId(), 100)
+
+    views['during_compute'] = skipped_change
+    LeaderboardView.refresh(KEY)
+    assert views['computed'] == 3
+    assert views['collection'].docs[KEY]['version'] == 2
+
+def test_unaffected_changes_skip_the_refresh(views):
+    views['entries'] = board(300, 200)['entries']
+    LeaderboardView.refresh(KEY)
+    assert not LeaderboardView.refresh_if_affected(KEY, ObjectId(), 100)
+    assert views['computed'] == 1
+    assert views['collection'].docs[KEY]['skipped'] == 1
+
+def test_affected_changes_refresh_the_board(views):
+    views['entries'] = board(300, 200)['entries']
+    LeaderboardView.refresh(KEY)
+    assert LeaderboardView.refresh_if_affected(KEY, ObjectId(), 250)
+    assert views['collection'].docs[KEY]['version'] == 2
+
+def test_failed_refreshes_drop_the_board(views, monkeypatch):
+    LeaderboardView.refresh(KEY)
+
+    def timeout(key):
+        raise ExecutionTimeout('operation exceeded time limit')
+
+    monkeypatch.setattr(LeaderboardView, '_compute', staticmethod(timeout))
+    assert not LeaderboardView.refresh_if_affected(KEY, ObjectId(), 0)
+    assert KEY not in views['collection'].docs
+
+def test_boards_that_keep_changing_are_dropped(views):
+    LeaderboardView.refresh(KEY)
+
+    def concurrent_store():
+        views['collection'].update_one({'_id': KEY}, {'$inc': {'version': 1}})
+        views['during_compute'] = concurrent_store
+
+    views['during_compute'] = concurrent_store
+    LeaderboardView.refresh(KEY, attempts=2)
+    assert KEY not in views['collection'].docs
+
+def test_team_renames_refresh_only_boards_listing_the_team(views):
+    team_id = ObjectId()
+    views['entries'] = [{'_id': ObjectId(), 'team_id': team_id, 'score': 10}]
+    LeaderboardView.refresh(KEY)
+    assert not LeaderboardView.refresh_if_team_listed(KEY, ObjectId())
+    assert LeaderboardView.refresh_if_team_listed(KEY, team_id)
+    assert views['computed'] == 2
@@ -0,0 +1,57 @@
+"""Sparse fieldsets: parsing, projections and compiled serializers"""
+
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from utils.serializers import build_projection, compile_serializer, parse_fields, serialize_doc
+
+ALLOWED = ('id', 'name', 'team_id', 'score', 'created_at')
+
+def test_no_fields_means_whole_documents():
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields('', ALLOWED) is None
+    assert parse_fields([], ALLOWED) is None
+
+def test_comma_separated_fields_are_trimmed_and_deduplicated():
+    assert parse_fields(' name, score,name ,', ALLOWED) == ('name', 'score')
+
+def test_lists_are_accepted():
+    assert parse_fields(['id', 'score'], ALLOWED) == ('id', 'score')
+    assert parse_fields(('score',), ALLOWED) == ('score',)
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match='password'):
+        parse_fields('name,password', ALLOWED)
+
+@pytest.mark.parametrize('value', [42, {'name': 1}, ['name', 1]])
+def test_other_types_are_rejected(value):
+    with pytest.raises(ValueError):
+        parse_fields(value, ALLOWED)
+
+def test_projection_maps_aliases_and_drops_id_unless_requested():
+    assert build_projection(('id', 'score')) == {'_id': 1, 'score': 1}
+    assert build_projection(('name',)) == {'name': 1, '_id': 0}
+    assert build_projection(None) is None
+
+def test_compiled_serializer_converts_and_filters_fields():
+    doc = {
+        '_id': ObjectId(),
+        'team_id': ObjectId(),
+        'name': 'Alice',
+        'score': 10,
+        'created_at': datetime(2024, 1, 2, 3, 4, 5),
+    }
+    serialize = compile_serializer(('id', 'team_id', 'created_at', 'score'))
+    assert serialize(doc) == {
+        'id': str(doc['_id']),
+        'team_id': str(doc['team_id']),
+        'created_at': '2024-01-02T03:04:05',
+        'score': 10,
+    }
+
+def test_compiled_serializer_skips_missing_fields():
+    assert compile_serializer(('name', 'score'))({'name': 'Bob'}) == {'name': 'Bob'}
+
+def test_compiled_serializers_are_reused_per_field_set():
+    assert compile_serializer(('name',)) is compile_serializer(('name',))
+    assert compile_serializer(None) is serialize_doc
@@ -0,0 +1,83 @@
+"""Coalescing of concurrent leaderboard reads"""
+
+import asyncio
+import threading
+import time
+import pytest
+from utils.singleflight import AsyncSingleFlight, SingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'board'
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do('teams', load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    # Give the followers time to join the in-flight call
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ['board'] * 8
+
+def test_nothing_is_cached_after_completion():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do('teams', lambda: next(counter)) == 0
+    assert flight.do('teams', lambda: next(counter)) == 1
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 'a') == 'a'
+    assert flight.do('b', lambda: 'b') == 'b'
+
+def test_errors_reach_the_caller_and_clear_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError('database down')
+
+    with pytest.raises(RuntimeError):
+        flight.do('teams', fail)
+    assert flight.do('teams', lambda: 'recovered') == 'recovered'
+
+def test_async_callers_share_one_execution():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'board'
+
+    async def main():
+        return await asyncio.gather(*(flight.do('teams', load) for _ in range(8)))
+
+    assert asyncio.run(main()) == ['board'] * 8
+    assert len(calls) == 1
+
+def test_async_cancelled_waiter_does_not_cancel_the_call():
+    flight = AsyncSingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return 'board'
+
+    async def main():
+        first = asyncio.ensure_future(flight.do('teams', load))
+        second = asyncio.ensure_future(flight.do('teams', load))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 'board'
@@ -0,0 +1,57 @@
+"""Score statistics cache: version checks and the minimum recompute interval"""
+
+import pytest
+from utils import stats as stats_cache
+from models.stats import Stats
+
+@pytest.fixture
+def scope(monkeypatch):
+    """A fake stats scope whose version and aggregation are controlled by the test"""
+    state = {'version': 1, 'computed': 0, 'now': 1000.0}
+
+    def compute(team_id, buckets):
+        state['computed'] += 1
+        return {'count': state['computed']}
+
+    monkeypatch.setattr(Stats, 'cache_key', staticmethod(lambda team_id=None: ('test', 'global')))
+    monkeypatch.setattr(Stats, 'get_version', staticmethod(lambda team_id=None: state['version']))
+    monkeypatch.setattr(Stats, 'compute', staticmethod(compute))
+    monkeypatch.setattr(stats_cache.time, 'monotonic', lambda: state['now'])
+    monkeypatch.setattr(stats_cache.Config, 'STATS_MIN_RECOMPUTE_INTERVAL', 5)
+    monkeypatch.setattr(stats_cache, '_cache', {})
+    return state
+
+def test_fresh_results_are_served_without_recomputing(scope):
+    first = stats_cache.get_score_stats()
+    scope['version'] += 1
+    scope['now'] += 1
+    assert stats_cache.get_score_stats() is first
+    assert scope['computed'] == 1
+
+def test_results_are_recomputed_after_the_interval_when_the_version_moved(scope):
+    stats_cache.get_score_stats()
+    scope['version'] += 1
+    scope['now'] += 6
+    assert stats_cache.get_score_stats()['count'] == 2
+
+def test_unchanged_versions_are_not_recomputed(scope):
+    first = stats_cache.get_score_stats()
+    scope['now'] += 60
+    assert stats_cache.get_score_stats() is first
+    assert scope['computed'] == 1
+
+def test_bucket_counts_are_cached_separately(scope):
+    stats_cache.get_score_stats(buckets=10)
+    stats_cache.get_score_stats(buckets=20)
+    assert scope['computed'] == 2
+
+def test_bucket_counts_default_and_bounds():
+    assert stats_cache.parse_buckets(None) == 10
+    assert stats_cache.parse_buckets('') == 10
+    assert stats_cache.parse_buckets('1') == 1
+    assert stats_cache.parse_buckets(stats_cache.STATS_BUCKETS_MAX) == stats_cache.STATS_BUCKETS_MAX
+
+@pytest.mark.parametrize('value', ['abc', '0', '-3', '101', '2.5'])
+def test_invalid_bucket_counts_are_rejected(value):
+    with pytest.raises(ValueError):
+        stats_cache.parse_buckets(value)
@@ -0,0 +1,41 @@
+"""Per-connection token bucket for socket leaderboard requests"""
+
+import pytest
+from utils import throttle
+from utils.throttle import Throttle
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the throttle module"""
+    now = [100.0]
+    monkeypatch.setattr(throttle.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_burst_then_reject(clock):
+    bucket = Throttle(rate=1, burst=3)
+    assert [bucket.allow('sid') for _ in range(4)] == [True, True, True, False]
+
+def test_tokens_refill_at_rate(clock):
+    bucket = Throttle(rate=2, burst=1)
+    assert bucket.allow('sid')
+    assert not bucket.allow('sid')
+    clock[0] += 0.5
+    assert bucket.allow('sid')
+
+def test_refill_is_capped_at_burst(clock):
+    bucket = Throttle(rate=1, burst=2)
+    bucket.allow('sid')
+    clock[0] += 60
+    assert [bucket.allow('sid') for _ in range(3)] == [True, True, False]
+
+def test_keys_are_independent(clock):
+    bucket = Throttle(rate=1, burst=1)
+    assert bucket.allow('a')
+    assert not bucket.allow('a')
+    assert bucket.allow('b')
+
+def test_forget_resets_the_bucket(clock):
+    bucket = Throttle(rate=1, burst=1)
+    bucket.allow('sid')
+    bucket.forget('sid')
+    assert bucket.allow('sid')
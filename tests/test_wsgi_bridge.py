@@ -0,0 +1,68 @@
+"""Serving the Flask app from the ASGI server"""
+
+import asyncio
+import threading
+import time
+import pytest
+from flask import Flask, Response
+
+pytest.importorskip('asgiref')
+
+from utils.wsgi_bridge import PooledWsgiToAsgi
+
+async def call(app, path):
+    """Run one GET through an ASGI app, returning (status, body)"""
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+        'http_version': '1.1', 'headers': [],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return messages[0]['status'], body
+
+def make_app(closed):
+    app = Flask(__name__)
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+    @app.route('/stream')
+    def stream():
+        response = Response(iter(['a', 'b']))
+        response.call_on_close(closed.set)
+        return response
+
+    return app
+
+def test_requests_run_concurrently():
+    app = PooledWsgiToAsgi(make_app(threading.Event()), max_workers=4)
+
+    async def main():
+        return await asyncio.gather(*(call(app, '/slow') for _ in range(4)))
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    assert [status for status, _ in results] == [200] * 4
+    assert len({body for _, body in results}) == 4
+    assert elapsed < 0.6
+
+def test_response_iterables_are_closed():
+    closed = threading.Event()
+    app = PooledWsgiToAsgi(make_app(closed), max_workers=1)
+
+    status, body = asyncio.run(call(app, '/stream'))
+
+    assert (status, body) == (200, b'ab')
+    assert closed.wait(1)
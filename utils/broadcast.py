@@ -0,0 +1,41 @@
+import threading
+from models.competition import competition_scope, room_for
+
+class BroadcastScheduler:
+    """Coalesces leaderboard broadcasts for one competition.
+
+    Any number of requests within interval seconds produce a single
+    broadcast of the latest team leaderboard to the competition's room.
+    """
+
+    def __init__(self, competition_id, emit, interval):
+        self.competition_id = competition_id
+        self.emit = emit
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = False
+
+    def request(self):
+        """Schedule a broadcast unless one is already pending"""
+        with self._lock:
+            if self._pending:
+                return
+            self._pending = True
+
+        timer = threading.Timer(self.interval, self._fire)
+        timer.daemon = True
+        timer.start()
+
+    def _fire(self):
+        from utils.leaderboard import get_leaderboard_snapshot
+
+        # Clear first so changes made while the snapshot is built schedule another broadcast
+        with self._lock:
+            self._pending = False
+
+        try:
+            with competition_scope(self.competition_id):
+                snapshot = get_leaderboard_snapshot()
+            self.emit(snapshot.payload, room_for(self.competition_id))
+        except Exception as e:
+            print(f"[WebSocket] Broadcast for competition {self.competition_id} failed: {e}")
@@ -0,0 +1,48 @@
+from flask import g, jsonify, request
+from pymongo.errors import PyMongoError
+from config import Config
+from models.competition import (
+    Competition, CompetitionNotFoundError, reset_competition, set_competition, validate_competition_id
+)
+from utils.load_shedding import DATABASE_UNAVAILABLE_ERRORS, PROBE_ENDPOINTS, database_unavailable
+
+def requested_competition(args, headers=None):
+    """Competition named by ?competition= or the X-Competition-Id header, or the default
+
+    Raises CompetitionNotFoundError for ids that are not registered.
+    """
+    competition_id = args.get('competition')
+    if not competition_id and headers is not None:
+        competition_id = headers.get('X-Competition-Id')
+    competition_id = validate_competition_id(competition_id or Config.DEFAULT_COMPETITION)
+    if not Competition.exists(competition_id):
+        raise CompetitionNotFoundError(competition_id)
+    return competition_id
+
+def init_competition_scope(app):
+    """Run every HTTP request against the competition it names"""
+
+    @app.before_request
+    def enter_competition():
+        if request.endpoint in PROBE_ENDPOINTS:
+            competition_id = Config.DEFAULT_COMPETITION
+        else:
+            try:
+                competition_id = requested_competition(request.args, request.headers)
+            except CompetitionNotFoundError as e:
+                return jsonify({'error': str(e)}), 404
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except DATABASE_UNAVAILABLE_ERRORS as e:
+                return database_unavailable(e)
+            except PyMongoError as e:
+                return jsonify({'error': str(e)}), 500
+
+        g.competition_token = set_competition(competition_id)
+        return None
+
+    @app.teardown_request
+    def leave_competition(exc):
+        token = g.pop('competition_token', None)
+        if token is not None:
+            reset_competition(token)
@@ -0,0 +1,65 @@
+import gzip
+from flask import request
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/csv',
+    'text/html',
+    'text/plain',
+}
+
+def available_encodings():
+    """Encodings this server can produce, in order of preference"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def choose_encoding(size, min_size, accept_encoding=None):
+    """Pick the best encoding the client accepts, or None
+
+    accept_encoding is a raw Accept-Encoding header value; by default it
+    is taken from the current Flask request.
+    """
+    if size < min_size:
+        return None
+    if accept_encoding is None:
+        accepted = request.accept_encodings
+    else:
+        accepted = parse_accept_header(accept_encoding, Accept)
+    return accepted.best_match(available_encodings())
+
+def compress(data, encoding):
+    """Compress bytes with the given content encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+def init_compression(app):
+    """Compress eligible responses according to the request's Accept-Encoding"""
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+    
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough
+                or response.is_streamed
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = choose_encoding(len(data), min_size)
+        if encoding:
+            response.set_data(compress(data, encoding))
+            response.headers['Content-Encoding'] = encoding
+        return response
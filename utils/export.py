@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from utils.serializers import serialize_doc
+
+def rank_rows(docs, group_key=None):
+    """Yield serialized docs with a rank field, computed while streaming.
+
+    Uses standard competition ranking: tied scores share a rank and the
+    next rank skips ahead (1, 2, 2, 4). When group_key is given, ranks
+    restart every time the value of that field changes.
+    """
+    position = 0
+    rank = 0
+    previous_score = None
+    previous_group = None
+
+    for doc in docs:
+        group = doc.get(group_key) if group_key else None
+        if group != previous_group:
+            position = 0
+            previous_score = None
+            previous_group = group
+
+        position += 1
+        score = doc.get('score', 0)
+        if score != previous_score:
+            rank = position
+            previous_score = score
+
+        row = serialize_doc(doc)
+        row['rank'] = rank
+        yield row
+
+def stream_ndjson(rows, chunk_size=500):
+    """Encode rows as newline-delimited JSON, yielding one chunk per chunk_size rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def stream_csv(rows, columns, chunk_size=500):
+    """Encode rows as CSV with a header line, yielding one chunk per chunk_size rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
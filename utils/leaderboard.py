@@ -0,0 +1,270 @@
+import base64
+import json
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from models.competition import current_competition
+from models.leaderboard_view import LeaderboardView
+from models.team import Team
+from models.user import User
+from utils.compression import compress
+from utils.serializers import build_projection, compile_serializer
+from utils.singleflight import AsyncSingleFlight, SingleFlight
+
+# Concurrent identical leaderboard reads share one query and one encoding
+_flight = SingleFlight()
+_async_flight = AsyncSingleFlight()
+
+# Last snapshot per competition, board and field set, reused until the view's
+# version changes
+_snapshots = {}
+
+# Largest page of the global player leaderboard a client can request
+PLAYER_PAGE_MAX = 100
+
+class Snapshot:
+    """A leaderboard payload with its JSON encoding and compressed variants"""
+    
+    def __init__(self, payload, version=None):
+        self.payload = payload
+        self.version = version
+        self.body = json.dumps(payload).encode('utf-8')
+        self.stale = False
+        self._compressed = {}
+    
+    def as_stale(self):
+        """Copy of this snapshot flagged as served from cache during an outage"""
+        snapshot = Snapshot.__new__(Snapshot)
+        snapshot.__dict__.update(self.__dict__)
+        snapshot.stale = True
+        return snapshot
+    
+    def encode(self, encoding=None):
+        """Get the body in the given content encoding, compressing at most once"""
+        if not encoding:
+            return self.body
+        if encoding not in self._compressed:
+            self._compressed[encoding] = compress(self.body, encoding)
+        return self._compressed[encoding]
+
+class PlayerBoard:
+    """The players view for one field set, serialized once and sliced per page size"""
+    
+    def __init__(self, entries, fields, version=None):
+        serialize = compile_serializer(fields)
+        self.entries = entries
+        self.rows = [serialize(user) for user in entries]
+        self.fields = fields
+        self.version = version
+        self.stale = False
+        self._pages = {}
+    
+    def as_stale(self):
+        """Copy of this board whose pages are flagged as served from cache"""
+        board = PlayerBoard.__new__(PlayerBoard)
+        board.__dict__.update(self.__dict__)
+        board.stale = True
+        return board
+    
+    def page(self, limit):
+        """Snapshot of the first limit players, encoded at most once per board"""
+        snapshot = self._pages.get(limit)
+        if snapshot is None:
+            entries = self.entries[:limit]
+            snapshot = Snapshot({
+                'type': 'players',
+                'leaderboard': self.rows[:limit],
+                'next_cursor': encode_cursor(entries[-1]) if len(entries) == limit else None
+            }, self.version)
+            self._pages[limit] = snapshot
+        return snapshot.as_stale() if self.stale else snapshot
+
+def get_leaderboard_snapshot(team_id=None, fields=None):
+    """Get the team leaderboard, or a team's user leaderboard when team_id is given
+
+    fields is a tuple of API field names (see utils.serializers.parse_fields)
+    limiting what is fetched and returned for each entry. Returns None when
+    team_id names no team.
+    """
+    competition_id = current_competition()
+    if team_id:
+        return _flight.do((competition_id, 'users', team_id, fields), lambda: _load_snapshot(team_id, fields))
+    return _flight.do((competition_id, 'teams', fields), lambda: _load_snapshot(None, fields))
+
+def get_players_snapshot(fields=None, limit=50):
+    """Get the first page of the global player leaderboard from its materialized view"""
+    key = LeaderboardView.PLAYERS_KEY
+    board = _flight.do(
+        (current_competition(), 'players', fields),
+        lambda: _load_cached((key, fields), key, lambda version: _build_player_board(fields, version))
+    )
+    return board.page(limit)
+
+def parse_page_limit(value, default=50):
+    """Validate a player page size, raising ValueError outside 1..PLAYER_PAGE_MAX"""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        limit = 0
+    if not 1 <= limit <= PLAYER_PAGE_MAX:
+        raise ValueError(f'limit must be between 1 and {PLAYER_PAGE_MAX}')
+    return limit
+
+def get_players_page(fields=None, limit=50, cursor=None):
+    """Get a page of the global player leaderboard straight from the score index
+
+    cursor is the next_cursor of the previous page. Raises ValueError for a
+    malformed cursor.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    users = User.get_global_leaderboard(limit, after, build_projection(_player_query_fields(fields)))
+    return _players_payload(users, fields, limit)
+
+def encode_cursor(doc):
+    """Opaque keyset cursor pointing after doc"""
+    raw = json.dumps([doc['score'], str(doc['_id'])]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    """Parse a cursor from encode_cursor into (score, _id)"""
+    try:
+        score, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        user_id = ObjectId(user_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    # score goes into the query as is, so it must not carry query operators
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise ValueError('Invalid cursor')
+    return score, user_id
+
+def _load_snapshot(team_id, fields):
+    """Load a team or team-user board snapshot through the version cache"""
+    key = _view_key(team_id)
+    if key is None:
+        return None
+    return _load_cached((key, fields), key, lambda version: _build_snapshot(team_id, fields, version))
+
+def _load_cached(cache_key, view_key, build):
+    """Reuse the cached snapshot while its view is unchanged, otherwise rebuild it
+
+    When MongoDB is slow or the circuit breaker is open, the last good
+    snapshot is served (marked stale) instead of failing the request.
+    """
+    cache_key = (current_competition(), *cache_key)
+    cached = _snapshots.get(cache_key)
+    
+    try:
+        version = LeaderboardView.get_version(view_key) if view_key else None
+        if cached is not None and version is not None and cached.version == version:
+            return cached
+        
+        snapshot = build(version)
+    except PyMongoError as e:
+        if cached is None:
+            raise
+        print(f"[ERROR] Serving cached leaderboard {view_key}: {e}")
+        return cached.as_stale()
+    
+    if snapshot is not None and version is not None:
+        _snapshots[cache_key] = snapshot
+    else:
+        _snapshots.pop(cache_key, None)
+    return snapshot
+
+async def get_leaderboard_snapshot_async(team_id=None, fields=None):
+    """Non-blocking get_leaderboard_snapshot for the asyncio (ASGI) mode"""
+    competition_id = current_competition()
+    key = (competition_id, 'users', team_id, fields) if team_id else (competition_id, 'teams', fields)
+    return await _async_flight.do(key, lambda: _load_snapshot_async(team_id, fields))
+
+async def _load_snapshot_async(team_id, fields):
+    """Same caching as _load_snapshot, reading views through Motor"""
+    from models.aio import AsyncLeaderboardView
+    
+    key = _view_key(team_id)
+    if key is None:
+        return None
+    cache_key = (current_competition(), key, fields)
+    cached = _snapshots.get(cache_key)
+    
+    try:
+        version = await AsyncLeaderboardView.get_version(key) if key else None
+        if cached is not None and version is not None and cached.version == version:
+            return cached
+        
+        entries = await AsyncLeaderboardView.get_entries(key, build_projection(fields))
+    except PyMongoError as e:
+        if cached is None:
+            raise
+        print(f"[ERROR] Serving cached leaderboard {key}: {e}")
+        return cached.as_stale()
+    
+    snapshot = _make_snapshot(team_id, fields, entries, version) if entries is not None else None
+    if snapshot is not None and version is not None:
+        _snapshots[cache_key] = snapshot
+    else:
+        _snapshots.pop(cache_key, None)
+    return snapshot
+
+def _view_key(team_id):
+    """Materialized view key for a board, or None for an invalid team_id"""
+    if not team_id:
+        return LeaderboardView.TEAMS_KEY
+    if not ObjectId.is_valid(team_id):
+        return None
+    return LeaderboardView.team_users_key(team_id)
+
+def _build_snapshot(team_id, fields, version):
+    """Query and serialize a leaderboard once, or None for an unknown team"""
+    projection = build_projection(fields)
+    
+    if team_id:
+        entries = User.get_leaderboard_by_team(team_id, projection)
+        if entries is None:
+            return None
+    else:
+        entries = Team.get_leaderboard(projection)
+    return _make_snapshot(team_id, fields, entries, version)
+
+def _make_snapshot(team_id, fields, entries, version):
+    """Serialize leaderboard entries into a snapshot"""
+    serialize = compile_serializer(fields)
+    
+    if team_id:
+        return Snapshot({
+            'type': 'users',
+            'team_id': team_id,
+            'leaderboard': [serialize(user) for user in entries]
+        }, version)
+    
+    return Snapshot({
+        'type': 'teams',
+        'leaderboard': [serialize(team) for team in entries]
+    }, version)
+
+def _player_query_fields(fields):
+    """Fields to fetch for player rows: the requested ones plus what paging needs"""
+    if fields is None:
+        return None
+    needed = [field for field in fields if field != 'team_name'] + ['id', 'score']
+    if 'team_name' in fields:
+        needed.append('team_id')
+    return tuple(dict.fromkeys(needed))
+
+def _build_player_board(fields, version):
+    """Read and serialize the whole players view once for a field set"""
+    view_fields = None
+    if fields is not None:
+        view_fields = tuple(dict.fromkeys(fields + ('id', 'score')))
+    entries = LeaderboardView.get_entries(LeaderboardView.PLAYERS_KEY, build_projection(view_fields))
+    return PlayerBoard(entries, fields, version)
+
+def _players_payload(users, fields, limit):
+    """Player page payload with the cursor for the next page"""
+    serialize = compile_serializer(fields)
+    return {
+        'type': 'players',
+        'leaderboard': [serialize(user) for user in users],
+        'next_cursor': encode_cursor(users[-1]) if len(users) == limit else None
+    }
@@ -0,0 +1,53 @@
+import threading
+from flask import current_app, g, jsonify, request
+from pymongo.errors import ConnectionFailure, ExecutionTimeout
+from models.database import CircuitOpenError, db_manager
+
+# Endpoints never shed: probes must answer even when the instance is saturated
+PROBE_ENDPOINTS = {'health.liveness', 'health.readiness'}
+
+# Endpoints that still work with the circuit breaker open, from cache or without the database
+BREAKER_EXEMPT_ENDPOINTS = PROBE_ENDPOINTS | {
+    'index',
+    'leaderboard.get_leaderboard',
+    'leaderboard.get_player_leaderboard'
+}
+
+# Database errors meaning "try again later" rather than a bad request or a bug
+DATABASE_UNAVAILABLE_ERRORS = (CircuitOpenError, ConnectionFailure, ExecutionTimeout)
+
+def service_unavailable(message, retry_after):
+    """503 response telling the client when to retry"""
+    response = jsonify({'error': message})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+def database_unavailable(error):
+    """503 response for one of DATABASE_UNAVAILABLE_ERRORS"""
+    if isinstance(error, CircuitOpenError):
+        return service_unavailable(str(error), error.retry_after)
+    return service_unavailable('Database unavailable', current_app.config['RETRY_AFTER_SECONDS'])
+
+def init_load_shedding(app):
+    """Bound in-flight requests and fail fast while the database circuit is open"""
+    slots = threading.BoundedSemaphore(app.config['MAX_IN_FLIGHT_REQUESTS'])
+    retry_after = app.config['RETRY_AFTER_SECONDS']
+    
+    @app.before_request
+    def admit_request():
+        endpoint = request.endpoint
+        if endpoint in PROBE_ENDPOINTS:
+            return None
+        
+        if db_manager.breaker.is_open and endpoint not in BREAKER_EXEMPT_ENDPOINTS:
+            return service_unavailable('Database unavailable', db_manager.breaker.retry_after())
+        
+        if not slots.acquire(blocking=False):
+            return service_unavailable('Server busy, try again later', retry_after)
+        g.holds_request_slot = True
+        return None
+    
+    @app.teardown_request
+    def release_request_slot(exc):
+        if g.pop('holds_request_slot', False):
+            slots.release()
@@ -1,5 +1,6 @@
 from bson import ObjectId
 from datetime import datetime
+from functools import lru_cache
 
 def serialize_doc(doc):
     """Convert MongoDB document to JSON-serializable dict"""
@@ -20,3 +21,81 @@ def serialize_doc(doc):
         serialized['id'] = serialized.pop('_id')
     
     return serialized
+
+# API field name -> document key, for fields that are renamed on the way out
+FIELD_ALIASES = {'id': '_id'}
+
+ID_FIELDS = {'_id', 'team_id'}
+DATETIME_FIELDS = {'created_at', 'updated_at'}
+
+def parse_fields(value, allowed):
+    """Parse a comma-separated ?fields= value, or a list of names, into a tuple of API field names.
+    
+    Returns None when no fields were requested. Raises ValueError for
+    fields outside allowed or a value that is neither a string nor a list.
+    """
+    if not value:
+        return None
+    
+    if isinstance(value, str):
+        names = value.split(',')
+    elif isinstance(value, (list, tuple)) and all(isinstance(f, str) for f in value):
+        names = value
+    else:
+        raise ValueError('fields must be a comma-separated string or a list of field names')
+    
+    fields = tuple(dict.fromkeys(f.strip() for f in names if f.strip()))
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields or None
+
+def build_projection(fields):
+    """Build a MongoDB projection for API field names, or None for whole documents"""
+    if fields is None:
+        return None
+    
+    projection = {FIELD_ALIASES.get(field, field): 1 for field in fields}
+    if 'id' not in fields:
+        projection['_id'] = 0
+    return projection
+
+def _convert_id(value):
+    return str(value) if value is not None else None
+
+def _convert_datetime(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+@lru_cache(maxsize=128)
+def compile_serializer(fields=None):
+    """Get a serializer specialised for a field set.
+    
+    Converters are chosen once per field set from the field names, so
+    serializing a document is a single pass over the requested keys.
+    Without fields this is serialize_doc.
+    """
+    if fields is None:
+        return serialize_doc
+    
+    plan = []
+    for field in fields:
+        key = FIELD_ALIASES.get(field, field)
+        if key in ID_FIELDS:
+            converter = _convert_id
+        elif key in DATETIME_FIELDS:
+            converter = _convert_datetime
+        else:
+            converter = None
+        plan.append((field, key, converter))
+    
+    def serialize(doc):
+        if doc is None:
+            return None
+        serialized = {}
+        for field, key, converter in plan:
+            if key in doc:
+                value = doc[key]
+                serialized[field] = converter(value) if converter else value
+        return serialized
+    
+    return serialize
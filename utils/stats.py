@@ -0,0 +1,60 @@
+import threading
+import time
+from config import Config
+from models.stats import Stats
+from utils.singleflight import SingleFlight
+
+# Concurrent cache misses for the same scope share one aggregation
+_flight = SingleFlight()
+
+# (competition, scope, buckets) -> (version, computed_at, stats)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Most histogram buckets a client can request
+STATS_BUCKETS_MAX = 100
+
+def parse_buckets(value, default=10):
+    """Validate a histogram bucket count, raising ValueError outside 1..STATS_BUCKETS_MAX"""
+    if value is None or value == '':
+        return default
+    try:
+        buckets = int(value)
+    except (TypeError, ValueError):
+        buckets = 0
+    if not 1 <= buckets <= STATS_BUCKETS_MAX:
+        raise ValueError(f'buckets must be between 1 and {STATS_BUCKETS_MAX}')
+    return buckets
+
+def get_score_stats(team_id=None, buckets=10):
+    """Get cached score statistics
+
+    Results younger than STATS_MIN_RECOMPUTE_INTERVAL are served as is;
+    older ones are recomputed only when the scope's version moved, so a
+    busy event runs at most one aggregation per scope and interval.
+    """
+    key = (*Stats.cache_key(team_id), buckets)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < Config.STATS_MIN_RECOMPUTE_INTERVAL:
+        return cached[2]
+    return _flight.do(key, lambda: _load_stats(key, team_id, buckets))
+
+def _load_stats(key, team_id, buckets):
+    # Read the version before aggregating so a concurrent write always
+    # leaves the cached result marked stale
+    version = Stats.get_version(team_id)
+    now = time.monotonic()
+    
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        with _cache_lock:
+            _cache[key] = (version, now, cached[2])
+        return cached[2]
+    
+    stats = Stats.compute(team_id, buckets)
+    stats['version'] = version
+    with _cache_lock:
+        _cache[key] = (version, now, stats)
+    return stats
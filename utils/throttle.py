@@ -0,0 +1,28 @@
+import threading
+import time
+
+class Throttle:
+    """Per-key token bucket: rate tokens per second, bursts up to burst"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+    
+    def allow(self, key):
+        """Take a token for key, returning False when the bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            return True
+    
+    def forget(self, key):
+        """Drop the bucket for key, e.g. when a connection closes"""
+        with self._lock:
+            self._buckets.pop(key, None)
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+# asgiref's own WSGI runner, undecorated: its @sync_to_async is thread-sensitive,
+# which runs every request on one shared thread
+_run_wsgi_app = WsgiToAsgiInstance.__dict__['run_wsgi_app'].func
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that runs requests concurrently on a thread pool
+
+    Also closes WSGI response iterables, which asgiref skips, so
+    Response.call_on_close callbacks run once a response is sent.
+    """
+
+    def __init__(self, wsgi_application, max_workers):
+        super().__init__(_closing(wsgi_application))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        await _PooledInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+class _PooledInstance(WsgiToAsgiInstance):
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(_run_wsgi_app, thread_sensitive=False, executor=self.executor)(self, body)
+
+def _closing(wsgi_application):
+    """Wrap a WSGI app so its response iterable is always closed"""
+    def app(environ, start_response):
+        result = wsgi_application(environ, start_response)
+        try:
+            yield from result
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    return app